@@ -7,17 +7,25 @@ to detect and analyze API breaking changes in Protocol Buffer definitions.
 """
 
 import asyncio
+import codecs
+import copy
+import functools
+import hashlib
+import io
 import json
 import logging
 import os
+import re
+import sqlite3
 import subprocess
 import sys
+from contextlib import closing
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, TypedDict, Annotated
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, Annotated
 import operator
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -28,6 +36,7 @@ from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from pydantic import BaseModel, Field as PyField  # Updated to use pydantic v2 directly
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain.tools import Tool
 from langchain.agents import AgentExecutor, create_structured_chat_agent
@@ -36,6 +45,8 @@ from langgraph.graph import StateGraph, END
 # from langgraph.prebuilt import ToolExecutor, ToolInvocation  # Not used, removed in newer versions
 # from langgraph.checkpoint import MemorySaver  # Not used
 
+from compat import DATACLASS_SLOTS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,10 +54,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dump_json(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
 
 # Configuration
 PROJECT_ID = os.environ.get("GCP_PROJECT")
 LOCATION = os.environ.get("GCP_REGION", "us-central1")
+ENABLE_CACHE = os.environ.get("ENABLE_CACHE", "true").lower() == "true"
+CACHE_DIR = Path(os.environ.get("CACHE_DIR", Path.home() / ".cache" / "api-compat"))
+
+# Above this many diff characters, files are sent to the LLM as separate concurrent prompts
+LLM_BATCH_THRESHOLD_CHARS = 40000
+MAX_CONCURRENT_LLM_REQUESTS = 4
 
 # Validate required environment variables
 if not PROJECT_ID:
@@ -55,6 +85,11 @@ if not PROJECT_ID:
     sys.exit(1)
 
 
+# Define the order: NONE < LOW < MEDIUM < HIGH < CRITICAL
+_SEVERITY_RANKS = {"NONE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
+
+
+@functools.total_ordering
 class BreakingSeverity(Enum):
     """Severity levels for breaking changes"""
     NONE = "NONE"
@@ -63,13 +98,15 @@ class BreakingSeverity(Enum):
     HIGH = "HIGH"
     CRITICAL = "CRITICAL"
 
+    def __init__(self, value: str):
+        # Cache the rank on the member so comparisons are a plain integer compare
+        self._rank = _SEVERITY_RANKS[value]
+
     def __lt__(self, other):
         """Define ordering for severity levels"""
         if not isinstance(other, BreakingSeverity):
             return NotImplemented
-        # Define the order: NONE < LOW < MEDIUM < HIGH < CRITICAL
-        order = ["NONE", "LOW", "MEDIUM", "HIGH", "CRITICAL"]
-        return order.index(self.value) < order.index(other.value)
+        return self._rank < other._rank
 
 
 class ChangeCategory(Enum):
@@ -90,7 +127,12 @@ class ChangeCategory(Enum):
     SEMANTIC_CHANGE = "semantic_change"
 
 
-@dataclass
+# Case-insensitive lookups for the free-form values returned by the LLM
+CATEGORY_LOOKUP = {c.name: c for c in ChangeCategory}
+SEVERITY_LOOKUP = {s.name: s for s in BreakingSeverity}
+
+
+@dataclass(**DATACLASS_SLOTS)
 class APIChange:
     """Represents a single API change"""
     category: ChangeCategory
@@ -102,7 +144,7 @@ class APIChange:
     details: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class CompatibilityReport:
     """Complete compatibility analysis report"""
     timestamp: str
@@ -117,74 +159,125 @@ class CompatibilityReport:
     can_deploy: bool
 
 
+def run_command(cmd: List[str], cwd: Optional[Path] = None) -> subprocess.CompletedProcess:
+    """Run a command with no stdin, capturing its output as UTF-8 text"""
+    return subprocess.run(
+        cmd,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        encoding="utf-8",
+        errors="replace",
+        check=False
+    )
+
+
+async def run_command_async(cmd: List[str], cwd: Path) -> Tuple[int, str, str]:
+    """Run a command without blocking the event loop, returning (returncode, stdout, stderr)"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    return (proc.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"))
+
+
+@functools.lru_cache(maxsize=1)
+def _check_buf_installation():
+    """Check if buf is installed (once per process)"""
+    try:
+        run_command(["buf", "--version"]).check_returncode()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        logger.error("buf tool is not installed. Install it from https://buf.build/docs/installation")
+        raise RuntimeError("buf tool not found")
+
+
 class BufTool:
     """Integration with buf tool for proto analysis"""
 
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
-        self._check_buf_installation()
-
-    def _check_buf_installation(self):
-        """Check if buf is installed"""
-        try:
-            subprocess.run(["buf", "--version"], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            logger.error("buf tool is not installed. Install it from https://buf.build/docs/installation")
-            raise RuntimeError("buf tool not found")
+        _check_buf_installation()
 
     def lint(self) -> Dict[str, Any]:
         """Run buf lint on proto files"""
         try:
-            result = subprocess.run(
-                ["buf", "lint"],
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
-            return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "errors": result.stderr
-            }
+            result = run_command(["buf", "lint"], self.workspace_path)
+            return self._lint_result(result.returncode, result.stdout, result.stderr)
         except Exception as e:
             logger.error(f"buf lint failed: {e}")
             return {"success": False, "errors": str(e)}
 
+    async def lint_async(self) -> Dict[str, Any]:
+        """Run buf lint on proto files without blocking the event loop"""
+        try:
+            return self._lint_result(*await run_command_async(["buf", "lint"], self.workspace_path))
+        except Exception as e:
+            logger.error(f"buf lint failed: {e}")
+            return {"success": False, "errors": str(e)}
+
+    @staticmethod
+    def _lint_result(returncode: int, stdout: str, stderr: str) -> Dict[str, Any]:
+        """Build the lint result dictionary"""
+        return {
+            "success": returncode == 0,
+            "output": stdout,
+            "errors": stderr
+        }
+
+    @staticmethod
+    def _breaking_cmd(against: str) -> List[str]:
+        """Build the buf breaking command for a git reference"""
+        # Format the against parameter for buf
+        if against.startswith("branch="):
+            # For branch references, use .git#branch=name format
+            buf_against = f".git#{against}"
+        elif against in ["HEAD", "HEAD~1", "HEAD^"]:
+            # For HEAD references, use .git#ref format
+            buf_against = f".git#{against}"
+        else:
+            # Default format
+            buf_against = f".git#{against}"
+        return ["buf", "breaking", "--against", buf_against]
+
+    @staticmethod
+    def _breaking_result(returncode: int, stdout: str, stderr: str) -> Dict[str, Any]:
+        """Parse buf breaking output into a result dictionary"""
+        breaking_changes = []
+        if returncode != 0 and stderr:
+            # Parse breaking changes from stderr
+            for line in stderr.strip().split('\n'):
+                if line and not line.startswith('buf:'):
+                    breaking_changes.append(line)
+
+        return {
+            "success": returncode == 0,
+            "has_breaking_changes": len(breaking_changes) > 0,
+            "breaking_changes": breaking_changes,
+            "output": stdout,
+            "errors": stderr
+        }
+
     def breaking_check(self, against: str = "HEAD~1") -> Dict[str, Any]:
         """Check for breaking changes against a reference"""
         try:
-            # Format the against parameter for buf
-            if against.startswith("branch="):
-                # For branch references, use .git#branch=name format
-                buf_against = f".git#{against}"
-            elif against in ["HEAD", "HEAD~1", "HEAD^"]:
-                # For HEAD references, use .git#ref format
-                buf_against = f".git#{against}"
-            else:
-                # Default format
-                buf_against = f".git#{against}"
-
-            result = subprocess.run(
-                ["buf", "breaking", "--against", buf_against],
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
-
-            breaking_changes = []
-            if result.returncode != 0 and result.stderr:
-                # Parse breaking changes from stderr
-                for line in result.stderr.strip().split('\n'):
-                    if line and not line.startswith('buf:'):
-                        breaking_changes.append(line)
+            result = run_command(self._breaking_cmd(against), self.workspace_path)
+            return self._breaking_result(result.returncode, result.stdout, result.stderr)
+        except Exception as e:
+            logger.error(f"buf breaking check failed: {e}")
+            return {"success": False, "errors": str(e)}
 
-            return {
-                "success": result.returncode == 0,
-                "has_breaking_changes": len(breaking_changes) > 0,
-                "breaking_changes": breaking_changes,
-                "output": result.stdout,
-                "errors": result.stderr
-            }
+    async def breaking_check_async(self, against: str = "HEAD~1") -> Dict[str, Any]:
+        """Check for breaking changes without blocking the event loop"""
+        try:
+            return self._breaking_result(
+                *await run_command_async(self._breaking_cmd(against), self.workspace_path)
+            )
         except Exception as e:
             logger.error(f"buf breaking check failed: {e}")
             return {"success": False, "errors": str(e)}
@@ -192,11 +285,8 @@ class BufTool:
     def generate_docs(self) -> Dict[str, Any]:
         """Generate documentation from proto files"""
         try:
-            result = subprocess.run(
-                ["buf", "generate", "--template", "buf.gen.doc.yaml"],
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
+            result = run_command(
+                ["buf", "generate", "--template", "buf.gen.doc.yaml"], self.workspace_path
             )
             return {
                 "success": result.returncode == 0,
@@ -211,93 +301,171 @@ class BufTool:
 class GitAnalyzer:
     """Analyzes git diffs for proto file changes"""
 
+    # The new-side path of each file header; git C-quotes paths with special characters
+    DIFF_HEADER_PATTERN = re.compile(
+        r'^diff --git (?:"a/(?:[^"\\]|\\.)*"|a/.+?) (?:"b/((?:[^"\\]|\\.)*)"|b/(.+))$', re.MULTILINE
+    )
+    HUNK_HEADER_PATTERN = re.compile(r'^@@', re.MULTILINE)
+    # Quoted identifiers in buf messages, e.g. field "description" on message "Task"
+    BUF_SYMBOL_PATTERN = re.compile(r'"([A-Za-z_][\w.]*)"')
+    MAX_UNMATCHED_DIFF_CHARS = 2000
+
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
 
+    @staticmethod
+    def _diff_cmd(against: str, *args: str) -> List[str]:
+        """Build a git diff command for a comparison reference"""
+        # Handle different comparison types
+        if against.startswith("branch="):
+            # Compare against a branch
+            ref = against.replace("branch=", "")
+        elif against == "HEAD" or against == "staged":
+            # Compare working directory against HEAD (uncommitted changes)
+            ref = "HEAD"
+        else:
+            # Default comparison (e.g., HEAD~1)
+            ref = against
+        return ["git", "diff", ref, *args]
+
     def get_diff(self, file_path: str, against: str = "HEAD~1") -> str:
         """Get git diff for a specific file"""
         try:
-            # Handle different comparison types
-            if against.startswith("branch="):
-                # Compare against a branch
-                branch_name = against.replace("branch=", "")
-                cmd = ["git", "diff", branch_name, "--", file_path]
-            elif against == "HEAD" or against == "staged":
-                # Compare working directory against HEAD (uncommitted changes)
-                cmd = ["git", "diff", "HEAD", "--", file_path]
-            else:
-                # Default comparison (e.g., HEAD~1)
-                cmd = ["git", "diff", against, "--", file_path]
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
+            result = run_command(self._diff_cmd(against, "--", file_path), self.workspace_path)
             return result.stdout
         except Exception as e:
             logger.error(f"git diff failed: {e}")
             return ""
 
-    def get_changed_files(self, against: str = "HEAD~1") -> List[str]:
-        """Get list of changed files"""
-        try:
-            # Handle different comparison types
-            if against.startswith("branch="):
-                # Compare against a branch
-                branch_name = against.replace("branch=", "")
-                cmd = ["git", "diff", branch_name, "--name-only"]
-            elif against == "HEAD" or against == "staged":
-                # Compare working directory against HEAD (uncommitted changes)
-                cmd = ["git", "diff", "HEAD", "--name-only"]
+    async def get_diffs_batch_async(self, files: List[str], against: str = "HEAD~1") -> Dict[str, str]:
+        """Get git diffs for several files with a single non-blocking git invocation
+
+        Diffs are keyed by the paths as requested. Raises RuntimeError if git fails.
+        """
+        if not files:
+            return {}
+        # Fixed prefixes and workspace-relative paths whatever the user's diff.* config says
+        returncode, stdout, stderr = await run_command_async(
+            self._diff_cmd(
+                against, "--no-color", "--no-ext-diff", "--relative",
+                "--src-prefix=a/", "--dst-prefix=b/", "--", *files
+            ),
+            self.workspace_path
+        )
+        if returncode != 0:
+            raise RuntimeError(f"git diff failed: {stderr.strip()}")
+        requested = {Path(file).as_posix(): file for file in files}
+        return {
+            requested.get(path, path): diff for path, diff in self._split_diffs(stdout).items()
+        }
+
+    @classmethod
+    def _split_diffs(cls, output: str) -> Dict[str, str]:
+        """Split combined git diff output into per-file diffs keyed by path"""
+        headers = list(cls.DIFF_HEADER_PATTERN.finditer(output))
+        ends = [m.start() for m in headers[1:]] + [len(output)]
+        return {
+            cls._header_path(m): output[m.start():end] for m, end in zip(headers, ends)
+        }
+
+    @staticmethod
+    def _header_path(match: "re.Match") -> str:
+        """Return the new-side path of a diff header, undoing git's C-style quoting"""
+        quoted, plain = match.groups()
+        if quoted is None:
+            return plain
+        # Quoted paths escape bytes as octal, so decode the escapes before the UTF-8
+        return codecs.escape_decode(quoted.encode())[0].decode("utf-8", errors="replace")
+
+    @classmethod
+    def prune_diffs(cls, git_diffs: Dict[str, str], breaking_changes: List[str]) -> Dict[str, str]:
+        """Reduce diffs to the hunks that mention symbols reported by buf
+
+        Diffs with no matching hunk are truncated to MAX_UNMATCHED_DIFF_CHARS.
+        """
+        symbols = {m for line in breaking_changes for m in cls.BUF_SYMBOL_PATTERN.findall(line)}
+        symbol_pattern = (
+            re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(symbols))) + r')\b')
+            if symbols else None
+        )
+
+        pruned = {}
+        for file, diff in git_diffs.items():
+            hunk_starts = [m.start() for m in cls.HUNK_HEADER_PATTERN.finditer(diff)]
+            matching = []
+            if symbol_pattern and hunk_starts:
+                ends = hunk_starts[1:] + [len(diff)]
+                matching = [
+                    diff[start:end] for start, end in zip(hunk_starts, ends)
+                    if symbol_pattern.search(diff, start, end)
+                ]
+            if matching:
+                pruned[file] = diff[:hunk_starts[0]] + "".join(matching)
+            elif len(diff) > cls.MAX_UNMATCHED_DIFF_CHARS:
+                pruned[file] = diff[:cls.MAX_UNMATCHED_DIFF_CHARS] + "\n... (diff truncated)\n"
             else:
-                # Default comparison (e.g., HEAD~1)
-                cmd = ["git", "diff", against, "--name-only"]
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
+                pruned[file] = diff
+        return pruned
+
+    async def get_changed_files_async(self, against: str = "HEAD~1") -> List[str]:
+        """Get list of changed proto files without blocking the event loop"""
+        try:
+            _, stdout, _ = await run_command_async(
+                self._diff_cmd(against, "--name-only", "--relative", "-z"), self.workspace_path
             )
-            return [f for f in result.stdout.strip().split('\n') if f.endswith('.proto')]
+            # NUL-separated, so paths git would otherwise quote come through as-is
+            return [f for f in stdout.split('\0') if f.endswith('.proto')]
         except Exception as e:
             logger.error(f"git diff --name-only failed: {e}")
             return []
 
 
+@functools.lru_cache(maxsize=256)
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    """Read a file, memoized on its modification time and size"""
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
 class ProtoReader:
     """Reads and parses proto files"""
 
+    # Directory and file names skipped during proto discovery
+    EXCLUDE_DIRS = frozenset({"vendor", "node_modules", ".git", "venv", "__pycache__", ".DS_Store"})
+
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
 
     def read_proto(self, file_path: str) -> str:
         """Read a proto file"""
         full_path = self.workspace_path / file_path
-        if full_path.exists():
-            try:
-                return full_path.read_text(encoding='utf-8')
-            except UnicodeDecodeError:
-                logger.warning(f"Skipping non-UTF8 file: {file_path}")
-                return ""
-        return ""
+        try:
+            stat = full_path.stat()
+        except OSError:
+            return ""
+        try:
+            return _read_text_cached(str(full_path), stat.st_mtime_ns, stat.st_size)
+        except UnicodeDecodeError:
+            logger.warning(f"Skipping non-UTF8 file: {file_path}")
+            return ""
 
     def get_all_protos(self) -> List[str]:
         """Get all proto files in the workspace"""
-        exclude_dirs = {"vendor", "node_modules", ".git", "venv", "__pycache__", ".DS_Store"}
-        proto_files = []
-        for p in self.workspace_path.rglob("*.proto"):
-            path_str = str(p)
-            # Skip files in excluded directories
-            if any(excluded in path_str for excluded in exclude_dirs):
-                continue
-            # Skip hidden files
-            if p.name.startswith('.'):
-                continue
-            proto_files.append(str(p.relative_to(self.workspace_path)))
-        return proto_files
+        exclude_dirs = self.EXCLUDE_DIRS
+
+        def walk(directory: str):
+            # Prune excluded and hidden entries before descending into them
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name in exclude_dirs or entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from walk(entry.path)
+                    elif entry.name.endswith('.proto'):
+                        yield entry.path
+
+        root = str(self.workspace_path)
+        return [os.path.relpath(path, root) for path in walk(root)]
 
 
 # Pydantic models for structured output
@@ -321,21 +489,80 @@ class CompatibilityAnalysis(BaseModel):
     recommendations: List[str] = PyField(default=[], description="General recommendations")
 
 
+class LLMCache:
+    """Persistent SQLite cache of LLM analyses keyed by the analyzed payload"""
+
+    def __init__(self, cache_path: Path = CACHE_DIR / "llm.sqlite"):
+        self.cache_path = cache_path
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(str(self.cache_path))) as conn, conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"LLM cache disabled: {e}")
+            self.cache_path = None
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Build a stable cache key from the LLM input payload"""
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CompatibilityAnalysis]:
+        """Return the cached analysis for a key, if any"""
+        if self.cache_path is None:
+            return None
+        try:
+            with closing(sqlite3.connect(str(self.cache_path))) as conn:
+                row = conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+            return CompatibilityAnalysis.model_validate_json(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, analysis: CompatibilityAnalysis):
+        """Store an analysis in the cache"""
+        if self.cache_path is None:
+            return
+        try:
+            with closing(sqlite3.connect(str(self.cache_path))) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)",
+                    (key, analysis.model_dump_json())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+
+# Shared BufTool instances keyed by workspace path
+_BUF_TOOLS: Dict[str, BufTool] = {}
+
+
+def get_buf_tool(workspace: str) -> BufTool:
+    """Return the shared BufTool for a workspace, creating it on first use"""
+    if workspace not in _BUF_TOOLS:
+        _BUF_TOOLS[workspace] = BufTool(Path(workspace))
+    return _BUF_TOOLS[workspace]
+
+
 # LangChain Tools
 @tool
 def run_buf_lint(workspace: str) -> str:
     """Run buf lint on proto files"""
-    buf = BufTool(Path(workspace))
+    buf = get_buf_tool(workspace)
     result = buf.lint()
-    return json.dumps(result)
+    return dump_json(result).decode()
 
 
 @tool
 def run_buf_breaking(workspace: str, against: str = "HEAD~1") -> str:
     """Check for breaking changes using buf"""
-    buf = BufTool(Path(workspace))
+    buf = get_buf_tool(workspace)
     result = buf.breaking_check(against)
-    return json.dumps(result)
+    return dump_json(result).decode()
 
 
 @tool
@@ -357,11 +584,12 @@ class AnalysisState(TypedDict):
     """State for the analysis workflow"""
     workspace: str
     against: str  # Git reference to compare against
+    started_at: str  # ISO timestamp of the run, used for the report
     proto_files: List[str]
     git_diffs: Dict[str, str]
+    diff_error: Optional[str]  # Set when git diff failed, so an empty git_diffs is not "no changes"
     buf_lint_results: Optional[Dict]
     buf_breaking_results: Optional[Dict]
-    proto_contents: Dict[str, str]
     llm_analysis: Optional[CompatibilityAnalysis]
     final_report: Optional[CompatibilityReport]
     current_step: str
@@ -371,11 +599,14 @@ class AnalysisState(TypedDict):
 class CompatibilityChecker:
     """Main compatibility checker using LangChain/LangGraph"""
 
-    def __init__(self, workspace_path: Path, model_name: str = "gemini-2.0-flash-exp"):
+    def __init__(self, workspace_path: Path, model_name: str = "gemini-2.0-flash-exp",
+                 use_cache: bool = ENABLE_CACHE):
         self.workspace_path = workspace_path
-        self.buf_tool = BufTool(workspace_path)
+        self.model_name = model_name
+        self.buf_tool = get_buf_tool(str(workspace_path))
         self.git_analyzer = GitAnalyzer(workspace_path)
         self.proto_reader = ProtoReader(workspace_path)
+        self.llm_cache = LLMCache() if use_cache else None
 
         # Initialize Vertex AI model
         self.llm = ChatVertexAI(
@@ -387,18 +618,43 @@ class CompatibilityChecker:
         )
 
         # Create the workflow
+        # The graph topology is static, so it is compiled once and shared;
+        # this checker is passed to the nodes through the run config
         self.workflow = self._create_workflow()
 
-    def _create_workflow(self) -> StateGraph:
+    def for_workspace(self, workspace_path: Path) -> 'CompatibilityChecker':
+        """Return a checker for another checkout that shares this one's LLM client and cache"""
+        checker = copy.copy(self)
+        checker.workspace_path = workspace_path
+        # Not get_buf_tool: short-lived checkouts should not accumulate in the shared registry
+        checker.buf_tool = BufTool(workspace_path)
+        checker.git_analyzer = GitAnalyzer(workspace_path)
+        checker.proto_reader = ProtoReader(workspace_path)
+        return checker
+
+    @staticmethod
+    def _bind_node(node: Callable) -> Callable:
+        """Adapt an unbound node method to take the checker from the run config"""
+        async def run(state: AnalysisState, config: RunnableConfig) -> Dict:
+            result = node(config["configurable"]["checker"], state)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        return run
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _create_workflow() -> StateGraph:
         """Create the LangGraph workflow"""
         workflow = StateGraph(AnalysisState)
+        bind = CompatibilityChecker._bind_node
 
         # Add nodes
-        workflow.add_node("collect_files", self._collect_files_node)
-        workflow.add_node("run_buf_checks", self._run_buf_checks_node)
-        workflow.add_node("collect_diffs", self._collect_diffs_node)
-        workflow.add_node("analyze_with_llm", self._analyze_with_llm_node)
-        workflow.add_node("generate_report", self._generate_report_node)
+        workflow.add_node("collect_files", bind(CompatibilityChecker._collect_files_node))
+        workflow.add_node("run_buf_checks", bind(CompatibilityChecker._run_buf_checks_node))
+        workflow.add_node("collect_diffs", bind(CompatibilityChecker._collect_diffs_node))
+        workflow.add_node("analyze_with_llm", bind(CompatibilityChecker._analyze_with_llm_node))
+        workflow.add_node("generate_report", bind(CompatibilityChecker._generate_report_node))
 
         # Set entry point
         workflow.set_entry_point("collect_files")
@@ -412,37 +668,36 @@ class CompatibilityChecker:
 
         return workflow.compile()
 
-    def _collect_files_node(self, state: AnalysisState) -> Dict:
+    async def _collect_files_node(self, state: AnalysisState) -> Dict:
         """Collect proto files that have changed"""
         logger.info("Collecting changed proto files...")
         # Get the 'against' parameter from command line via the state
         against = state.get("against", "branch=main")
-        changed_files = self.git_analyzer.get_changed_files(against)
+        changed_files = await self.git_analyzer.get_changed_files_async(against)
 
         if not changed_files:
-            # If no changes in git, collect all proto files for analysis
-            changed_files = self.proto_reader.get_all_protos()
-
-        proto_contents = {}
-        for file in changed_files:
-            logger.debug(f"Reading proto file: {file}")
-            content = self.proto_reader.read_proto(file)
-            if content:
-                proto_contents[file] = content
+            # If no changes in git, collect all proto files for analysis; the directory
+            # walk runs in a thread so concurrent checks keep making progress
+            changed_files = await asyncio.get_running_loop().run_in_executor(
+                None, self.proto_reader.get_all_protos
+            )
 
+        # Only diffs are sent to the LLM, so file contents are not read here
         return {
             "proto_files": changed_files,
-            "proto_contents": proto_contents,
             "current_step": "files_collected"
         }
 
-    def _run_buf_checks_node(self, state: AnalysisState) -> Dict:
+    async def _run_buf_checks_node(self, state: AnalysisState) -> Dict:
         """Run buf lint and breaking checks"""
         logger.info("Running buf checks...")
         against = state.get("against", "branch=main")
 
-        lint_results = self.buf_tool.lint()
-        breaking_results = self.buf_tool.breaking_check(against)
+        # lint and breaking are independent, so run them concurrently
+        lint_results, breaking_results = await asyncio.gather(
+            self.buf_tool.lint_async(),
+            self.buf_tool.breaking_check_async(against)
+        )
 
         # Log buf results for debugging
         logger.info(f"Buf breaking check results: {breaking_results}")
@@ -460,24 +715,46 @@ class CompatibilityChecker:
             "current_step": "buf_checks_complete"
         }
 
-    def _collect_diffs_node(self, state: AnalysisState) -> Dict:
+    async def _collect_diffs_node(self, state: AnalysisState) -> Dict:
         """Collect git diffs for changed files"""
         logger.info("Collecting git diffs...")
         against = state.get("against", "branch=main")
 
-        git_diffs = {}
-        for file in state["proto_files"]:
-            diff = self.git_analyzer.get_diff(file, against)
-            if diff:
-                git_diffs[file] = diff
+        # One git process for all files instead of one per file
+        try:
+            git_diffs = await self.git_analyzer.get_diffs_batch_async(state["proto_files"], against)
+        except (RuntimeError, OSError) as e:
+            logger.error(str(e))
+            return {
+                "git_diffs": {},
+                "diff_error": str(e),
+                "errors": state.get("errors", []) + [str(e)],
+                "current_step": "diffs_collected"
+            }
 
         return {
             "git_diffs": git_diffs,
             "current_step": "diffs_collected"
         }
 
-    def _analyze_with_llm_node(self, state: AnalysisState) -> Dict:
+    async def _analyze_with_llm_node(self, state: AnalysisState) -> Dict:
         """Analyze changes with LLM"""
+        # Nothing to analyze: skip the LLM round-trip entirely
+        buf_breaking = state.get("buf_breaking_results") or {}
+        if (not state.get("git_diffs") and not state.get("diff_error")
+                and not buf_breaking.get("breaking_changes")):
+            logger.info("No proto changes detected, skipping LLM analysis")
+            return {
+                "llm_analysis": CompatibilityAnalysis(
+                    changes=[],
+                    overall_assessment="No proto changes detected",
+                    can_deploy=True,
+                    risk_level="NONE",
+                    recommendations=[]
+                ),
+                "current_step": "llm_analysis_complete"
+            }
+
         logger.info("Analyzing with LLM...")
 
         # Prepare the analysis prompt
@@ -520,11 +797,30 @@ class CompatibilityChecker:
         chain = prompt | self.llm.with_structured_output(CompatibilityAnalysis)
 
         try:
-            # Only send the diffs and buf results, not the entire proto contents
-            analysis = chain.invoke({
-                "buf_breaking": json.dumps(state.get("buf_breaking_results", {})),
-                "git_diffs": json.dumps(state.get("git_diffs", {}))
-            })
+            # Only send the relevant diff hunks and buf results, not the entire proto
+            # contents; the full diffs stay in the state
+            llm_diffs = GitAnalyzer.prune_diffs(
+                state.get("git_diffs", {}), buf_breaking.get("breaking_changes", [])
+            )
+            inputs = {
+                "buf_breaking": dump_json(state.get("buf_breaking_results", {})).decode(),
+                "git_diffs": dump_json(llm_diffs).decode()
+            }
+
+            # Reuse a previous analysis of the exact same changes (e.g. CI re-runs)
+            cache_key = None
+            analysis = None
+            if self.llm_cache:
+                cache_key = LLMCache.make_key({"model": self.model_name, **inputs})
+                analysis = self.llm_cache.get(cache_key)
+                if analysis is not None:
+                    logger.info("Using cached LLM analysis")
+
+            if analysis is None:
+                analysis = await self._invoke_chain(chain, inputs["buf_breaking"], llm_diffs)
+                # The structured-output chain can return None, which is not worth caching
+                if self.llm_cache and analysis is not None:
+                    self.llm_cache.put(cache_key, analysis)
 
             return {
                 "llm_analysis": analysis,
@@ -537,6 +833,45 @@ class CompatibilityChecker:
                 "current_step": "llm_analysis_failed"
             }
 
+    async def _invoke_chain(self, chain, buf_breaking: str,
+                            git_diffs: Dict[str, str]) -> CompatibilityAnalysis:
+        """Invoke the analysis chain, splitting very large changesets into per-file prompts"""
+        total_chars = sum(len(diff) for diff in git_diffs.values())
+        if len(git_diffs) < 2 or total_chars <= LLM_BATCH_THRESHOLD_CHARS:
+            return await chain.ainvoke({
+                "buf_breaking": buf_breaking,
+                "git_diffs": dump_json(git_diffs).decode()
+            })
+
+        logger.info(f"Large changeset ({total_chars} chars), analyzing {len(git_diffs)} files concurrently")
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_REQUESTS)
+
+        async def analyze_file(file: str, diff: str) -> CompatibilityAnalysis:
+            async with semaphore:
+                return await chain.ainvoke({
+                    "buf_breaking": buf_breaking,
+                    "git_diffs": dump_json({file: diff}).decode()
+                })
+
+        analyses = await asyncio.gather(*(analyze_file(f, d) for f, d in git_diffs.items()))
+        return self._merge_analyses(analyses)
+
+    @staticmethod
+    def _merge_analyses(analyses: List[CompatibilityAnalysis]) -> CompatibilityAnalysis:
+        """Combine per-file analyses into a single analysis"""
+        risk_level = max(
+            (SEVERITY_LOOKUP.get(a.risk_level.strip().upper(), BreakingSeverity.MEDIUM) for a in analyses),
+            default=BreakingSeverity.NONE
+        )
+        return CompatibilityAnalysis(
+            changes=[change for a in analyses for change in a.changes],
+            overall_assessment="\n\n".join(a.overall_assessment for a in analyses),
+            can_deploy=all(a.can_deploy for a in analyses),
+            risk_level=risk_level.value,
+            # Keep the first occurrence of each recommendation, in order
+            recommendations=list(dict.fromkeys(r for a in analyses for r in a.recommendations))
+        )
+
     def _generate_report_node(self, state: AnalysisState) -> Dict:
         """Generate final compatibility report"""
         logger.info("Generating final report...")
@@ -545,38 +880,25 @@ class CompatibilityChecker:
         buf_breaking = state.get("buf_breaking_results", {})
 
         # Convert LLM analysis to APIChange objects
-        changes = []
-        if llm_analysis:
-            for change in llm_analysis.changes:
-                try:
-                    category = ChangeCategory[change.category.upper()]
-                except KeyError:
-                    category = ChangeCategory.SEMANTIC_CHANGE
-
-                try:
-                    severity = BreakingSeverity[change.severity.upper()]
-                except KeyError:
-                    severity = BreakingSeverity.MEDIUM
-
-                changes.append(APIChange(
-                    category=category,
-                    location=change.location,
-                    description=change.description,
-                    is_breaking=change.is_breaking,
-                    severity=severity,
-                    recommendation=change.recommendation,
-                    details={"migration_path": change.migration_path}
-                ))
+        changes = [
+            APIChange(
+                category=CATEGORY_LOOKUP.get(c.category.strip().upper(), ChangeCategory.SEMANTIC_CHANGE),
+                location=c.location,
+                description=c.description,
+                is_breaking=c.is_breaking,
+                severity=SEVERITY_LOOKUP.get(c.severity.strip().upper(), BreakingSeverity.MEDIUM),
+                recommendation=c.recommendation,
+                details={"migration_path": c.migration_path}
+            )
+            for c in (llm_analysis.changes if llm_analysis else ())
+        ]
 
         # Determine overall severity
-        if changes:
-            max_severity = max(c.severity for c in changes)
-        else:
-            max_severity = BreakingSeverity.NONE
+        max_severity = max((c.severity for c in changes), default=BreakingSeverity.NONE)
 
         # Create report
         report = CompatibilityReport(
-            timestamp=datetime.now().isoformat(),
+            timestamp=state["started_at"],
             proto_files=state["proto_files"],
             total_changes=len(changes),
             breaking_changes=sum(1 for c in changes if c.is_breaking),
@@ -595,14 +917,16 @@ class CompatibilityChecker:
 
     async def check_compatibility(self, against: str = "branch=main") -> CompatibilityReport:
         """Run the complete compatibility check"""
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
         initial_state = {
             "workspace": str(self.workspace_path),
             "against": against,  # Pass the against parameter through the workflow
+            "started_at": started_at,
             "proto_files": [],
             "git_diffs": {},
+            "diff_error": None,
             "buf_lint_results": None,
             "buf_breaking_results": None,
-            "proto_contents": {},
             "llm_analysis": None,
             "final_report": None,
             "current_step": "starting",
@@ -610,14 +934,17 @@ class CompatibilityChecker:
         }
 
         # Run the workflow
-        final_state = self.workflow.invoke(initial_state)
+        final_state = await self.workflow.ainvoke(
+            initial_state,
+            config={"configurable": {"checker": self}}
+        )
 
         if final_state.get("final_report"):
             return final_state["final_report"]
         else:
             # Create error report
             return CompatibilityReport(
-                timestamp=datetime.now().isoformat(),
+                timestamp=started_at,
                 proto_files=[],
                 total_changes=0,
                 breaking_changes=0,
@@ -631,47 +958,81 @@ class CompatibilityChecker:
 
     def format_report(self, report: CompatibilityReport) -> str:
         """Format report for display"""
-        output = []
-        output.append("=" * 80)
-        output.append("API BACKWARD COMPATIBILITY REPORT")
-        output.append("=" * 80)
-        output.append(f"Timestamp: {report.timestamp}")
-        output.append(f"Files Analyzed: {', '.join(report.proto_files)}")
-        output.append(f"Total Changes: {report.total_changes}")
-        output.append(f"Breaking Changes: {report.breaking_changes}")
-        output.append(f"Overall Severity: {report.overall_severity.value}")
-        output.append(f"Can Deploy: {'YES' if report.can_deploy else 'NO'}")
-        output.append("")
+        separator = "=" * 80
+        divider = "-" * 40
+        out = io.StringIO()
+        out.write(
+            f"{separator}\n"
+            "API BACKWARD COMPATIBILITY REPORT\n"
+            f"{separator}\n"
+            f"Timestamp: {report.timestamp}\n"
+            f"Files Analyzed: {', '.join(report.proto_files)}\n"
+            f"Total Changes: {report.total_changes}\n"
+            f"Breaking Changes: {report.breaking_changes}\n"
+            f"Overall Severity: {report.overall_severity.value}\n"
+            f"Can Deploy: {'YES' if report.can_deploy else 'NO'}\n"
+            "\n"
+        )
 
         if report.changes:
-            output.append("DETECTED CHANGES:")
-            output.append("-" * 40)
+            out.write(f"DETECTED CHANGES:\n{divider}\n")
             for i, change in enumerate(report.changes, 1):
-                output.append(f"{i}. {change.description}")
-                output.append(f"   Location: {change.location}")
-                output.append(f"   Category: {change.category.value}")
-                output.append(f"   Breaking: {'YES' if change.is_breaking else 'NO'}")
-                output.append(f"   Severity: {change.severity.value}")
-                output.append(f"   Recommendation: {change.recommendation}")
+                out.write(
+                    f"{i}. {change.description}\n"
+                    f"   Location: {change.location}\n"
+                    f"   Category: {change.category.value}\n"
+                    f"   Breaking: {'YES' if change.is_breaking else 'NO'}\n"
+                    f"   Severity: {change.severity.value}\n"
+                    f"   Recommendation: {change.recommendation}\n"
+                )
                 if change.details and change.details.get("migration_path"):
-                    output.append(f"   Migration: {change.details['migration_path']}")
-                output.append("")
+                    out.write(f"   Migration: {change.details['migration_path']}\n")
+                out.write("\n")
 
         if report.recommendations:
-            output.append("RECOMMENDATIONS:")
-            output.append("-" * 40)
-            for rec in report.recommendations:
-                output.append(f"• {rec}")
-            output.append("")
+            out.write(f"RECOMMENDATIONS:\n{divider}\n")
+            out.write("".join(f"• {rec}\n" for rec in report.recommendations))
+            out.write("\n")
 
         if report.llm_analysis:
-            output.append("LLM ANALYSIS:")
-            output.append("-" * 40)
-            output.append(report.llm_analysis)
-            output.append("")
-
-        output.append("=" * 80)
-        return "\n".join(output)
+            out.write(f"LLM ANALYSIS:\n{divider}\n{report.llm_analysis}\n\n")
+
+        out.write(separator)
+        return out.getvalue()
+
+    def write_report_json(self, report: CompatibilityReport, output_path: Path):
+        """Write the report as JSON, streaming the changes one at a time"""
+        def _member(name: str, value: Any) -> bytes:
+            return b'  "' + name.encode() + b'": ' + dump_json(value)
+
+        with open(output_path, 'wb') as f:
+            f.write(b'{\n')
+            f.write(b',\n'.join([
+                _member("timestamp", report.timestamp),
+                _member("proto_files", report.proto_files),
+                _member("total_changes", report.total_changes),
+                _member("breaking_changes", report.breaking_changes),
+                _member("overall_severity", report.overall_severity.value),
+                _member("can_deploy", report.can_deploy),
+            ]))
+            f.write(b',\n  "changes": [')
+            for i, c in enumerate(report.changes):
+                f.write(b',\n    ' if i else b'\n    ')
+                f.write(dump_json({
+                    "category": c.category.value,
+                    "location": c.location,
+                    "description": c.description,
+                    "is_breaking": c.is_breaking,
+                    "severity": c.severity.value,
+                    "recommendation": c.recommendation,
+                    "details": c.details
+                }))
+            f.write(b'\n  ],\n' if report.changes else b'],\n')
+            f.write(b',\n'.join([
+                _member("recommendations", report.recommendations),
+                _member("llm_analysis", report.llm_analysis),
+            ]))
+            f.write(b'\n}\n')
 
 
 async def main():
@@ -688,6 +1049,8 @@ async def main():
     parser.add_argument("--output", type=str, help="Output file for JSON report")
     parser.add_argument("--ci", action="store_true",
                        help="CI/CD mode - exit with error code if breaking changes")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always call the LLM instead of reusing cached analyses")
 
     args = parser.parse_args()
 
@@ -697,7 +1060,7 @@ async def main():
         sys.exit(1)
 
     # Run compatibility check
-    checker = CompatibilityChecker(workspace_path, args.model)
+    checker = CompatibilityChecker(workspace_path, args.model, use_cache=ENABLE_CACHE and not args.no_cache)
 
     try:
         report = await checker.check_compatibility(args.against)
@@ -711,29 +1074,7 @@ async def main():
             output_path = Path(args.output)
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(args.output, 'w') as f:
-                json.dump({
-                    "timestamp": report.timestamp,
-                    "proto_files": report.proto_files,
-                    "total_changes": report.total_changes,
-                    "breaking_changes": report.breaking_changes,
-                    "overall_severity": report.overall_severity.value,
-                    "can_deploy": report.can_deploy,
-                    "changes": [
-                        {
-                            "category": c.category.value,
-                            "location": c.location,
-                            "description": c.description,
-                            "is_breaking": c.is_breaking,
-                            "severity": c.severity.value,
-                            "recommendation": c.recommendation,
-                            "details": c.details
-                        }
-                        for c in report.changes
-                    ],
-                    "recommendations": report.recommendations,
-                    "llm_analysis": report.llm_analysis
-                }, f, indent=2)
+            checker.write_report_json(report, output_path)
             logger.info(f"JSON report saved to {args.output}")
 
         # CI/CD mode - exit with error if breaking changes
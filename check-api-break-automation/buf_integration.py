@@ -6,18 +6,157 @@ Provides a comprehensive interface to buf tool capabilities for proto analysis,
 including linting, breaking change detection, and code generation.
 """
 
+import asyncio
+import contextlib
+import functools
+import hashlib
 import json
 import logging
+import operator
+import os
+import re
+import shutil
 import subprocess
+import sys
 import tempfile
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from compat import DATACLASS_SLOTS
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed implementations when PyYAML was built with them
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+try:
+    import orjson
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can catch the latter
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Descriptors opened by Python are non-inheritable (PEP 446), so buf cannot inherit
+# stray handles with close_fds=False, and it spares the child the descriptor sweep. It is
+# also one of the conditions for CPython to use posix_spawn instead of fork/exec; the others
+# here are no cwd and an executable given with a directory, which holds for the calls
+# without a cwd (_buf_version, compare_images) when buf was found on PATH. Calls that pass
+# a cwd, and _run_async, always fork/exec.
+def _run(cmd: List[str], cwd: Optional[Path] = None, **kwargs) -> subprocess.CompletedProcess:
+    """Run a command to completion, capturing stdout and stderr"""
+    return subprocess.run(cmd, cwd=cwd, capture_output=True, close_fds=False, **kwargs)
+
+
+async def _run_async(cmd: List[str], cwd: Path) -> Tuple[int, bytes, bytes]:
+    """Run a command without blocking the event loop, returning (returncode, stdout, stderr) as bytes"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False
+    )
+    stdout, stderr = await proc.communicate()
+    return proc.returncode, stdout, stderr
+
+
+def _decode(output: bytes) -> str:
+    """Decode raw buf output for inclusion in result dictionaries"""
+    return output.decode("utf-8", errors="replace")
+
+
+# Keys of a buf JSON issue, in the positional order of the issue dataclasses
+BUF_ISSUE_KEYS = ("path", "start_line", "start_column", "type", "message")
+BUF_ISSUE_DEFAULTS = ("", 0, 0, "", "")
+_buf_issue_fields = operator.itemgetter(*BUF_ISSUE_KEYS)
+
+
+def _issue_fields(data: Dict[str, Any]) -> Tuple[str, int, int, str, str]:
+    """Extract (path, line, column, type, message) from a decoded buf JSON issue"""
+    try:
+        return _buf_issue_fields(data)
+    except KeyError:
+        # Module-level issues carry no location keys
+        return tuple(data.get(key, default) for key, default in zip(BUF_ISSUE_KEYS, BUF_ISSUE_DEFAULTS))
+
+
+# Buf breaking rule IDs (matched as substrings of the reported type) and their categories
+BREAKING_CATEGORIES = {
+    "FIELD_SAME_NUMBER": "field_number",
+    "FIELD_NO_DELETE": "field_removal",
+    "FIELD_SAME_TYPE": "field_type",
+    "FIELD_SAME_NAME": "field_rename",
+    "FIELD_SAME_ONEOF": "oneof_change",
+    "ENUM_VALUE_NO_DELETE": "enum_removal",
+    "ENUM_VALUE_SAME_NUMBER": "enum_number",
+    "RPC_NO_DELETE": "rpc_removal",
+    "RPC_SAME_REQUEST_TYPE": "rpc_request",
+    "RPC_SAME_RESPONSE_TYPE": "rpc_response",
+    "RPC_SAME_CLIENT_STREAMING": "rpc_streaming",
+    "RPC_SAME_SERVER_STREAMING": "rpc_streaming",
+    "PACKAGE_NO_DELETE": "package_removal",
+    "SERVICE_NO_DELETE": "service_removal"
+}
+BREAKING_CATEGORY_PATTERN = re.compile("|".join(map(re.escape, BREAKING_CATEGORIES)))
+
+
+@functools.lru_cache(maxsize=1)
+def _buf_executable() -> str:
+    """Resolve buf on PATH once so each spawn execs it directly"""
+    return shutil.which("buf") or "buf"
+
+
+@functools.lru_cache(maxsize=1)
+def _buf_version() -> str:
+    """Return the installed buf version, probing the binary once per process"""
+    try:
+        result = _run([_buf_executable(), "--version"], text=True, check=True)
+        version = result.stdout.strip()
+        logger.info(f"Buf version: {version}")
+        return version
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        logger.error("Buf tool is not installed")
+        raise RuntimeError("buf tool not found. Install from https://buf.build/docs/installation")
+
+
+# Built images are cached here keyed on a hash of the module contents
+CACHE_DIR = Path(os.environ.get("CACHE_DIR", Path.home() / ".cache" / "api-compat"))
+IMAGE_CACHE_DIR = CACHE_DIR / "buf-images"
+
+# Suffixes buf recognises as binary image inputs
+IMAGE_SUFFIXES = (".bin", ".binpb")
+
+# Files besides *.proto that affect the output of buf build
+BUF_CONFIG_FILES = ("buf.yaml", "buf.lock", "buf.work.yaml")
+
+# Directories never holding module sources, pruned when hashing a workspace (as are hidden ones)
+HASH_EXCLUDE_DIRS = frozenset({"vendor", "node_modules", "venv", "__pycache__"})
+
+
+@functools.lru_cache(maxsize=64)
+def _load_buf_config(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a buf.yaml, memoized on its modification time and size (treat as read-only)"""
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=YAML_LOADER)
+
+
+IMPORT_PATTERN = re.compile(rb'^\s*import\s+(?:public\s+|weak\s+)?"([^"]+)"', re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_imports(path: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
+    """Parse the imports of a proto file, memoized on its modification time and size"""
+    content = Path(path).read_bytes()
+    return tuple(m.group(1).decode() for m in IMPORT_PATTERN.finditer(content))
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class BufBreakingChange:
     """Represents a single breaking change detected by buf"""
     file: str
@@ -28,7 +167,7 @@ class BufBreakingChange:
     category: str
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class BufLintIssue:
     """Represents a lint issue detected by buf"""
     file: str
@@ -44,93 +183,68 @@ class BufIntegration:
 
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
+        self.config: Optional[Dict[str, Any]] = None
         self._check_installation()
         self._check_configuration()
 
     def _check_installation(self) -> bool:
         """Check if buf is installed and get version"""
-        try:
-            result = subprocess.run(
-                ["buf", "--version"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            self.version = result.stdout.strip()
-            logger.info(f"Buf version: {self.version}")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            logger.error("Buf tool is not installed")
-            raise RuntimeError("buf tool not found. Install from https://buf.build/docs/installation")
+        self.version = _buf_version()
+        return True
 
     def _check_configuration(self) -> bool:
         """Check if buf.yaml exists and is valid"""
         buf_yaml = self.workspace_path / "buf.yaml"
-        if not buf_yaml.exists():
+        # One stat both checks existence and keys the parsed-config cache
+        try:
+            stat = buf_yaml.stat()
+        except FileNotFoundError:
             logger.warning("buf.yaml not found in workspace")
             return False
 
-        # Validate configuration
+        # Validate configuration by parsing it rather than spawning buf
         try:
-            result = subprocess.run(
-                ["buf", "mod", "init", "--dry-run"],
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
-            return result.returncode == 0
+            config = _load_buf_config(str(buf_yaml), stat.st_mtime_ns, stat.st_size)
+            if not isinstance(config, dict) or "version" not in config:
+                logger.warning("buf.yaml is missing a version key")
+                return False
+            self.config = config
+            return True
         except Exception as e:
             logger.error(f"Failed to validate buf configuration: {e}")
             return False
 
-    def lint(self, format: str = "json") -> Dict[str, Any]:
+    def lint(self, format: str = "json", source: Optional[str] = None) -> Dict[str, Any]:
         """
         Run buf lint with detailed parsing
 
         Args:
             format: Output format (json or text)
+            source: Optional input to lint (e.g. a prebuilt image) instead of the workspace
 
         Returns:
             Dictionary containing lint results
         """
         try:
-            cmd = ["buf", "lint"]
-            if format == "json":
-                cmd.append("--error-format=json")
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
-
-            issues = []
-            if format == "json" and result.stderr:
-                # Parse JSON output
-                try:
-                    for line in result.stderr.strip().split('\n'):
-                        if line:
-                            issue_data = json.loads(line)
-                            issues.append(BufLintIssue(
-                                file=issue_data.get("path", ""),
-                                line=issue_data.get("start_line", 0),
-                                column=issue_data.get("start_column", 0),
-                                rule=issue_data.get("type", ""),
-                                message=issue_data.get("message", ""),
-                                severity="ERROR"
-                            ))
-                except json.JSONDecodeError:
-                    logger.warning("Failed to parse JSON lint output")
+            result = _run(self._lint_cmd(format, source), self.workspace_path)
+            return self._parse_lint(result.returncode, result.stdout, result.stderr, format)
 
+        except Exception as e:
+            logger.error(f"Buf lint failed: {e}")
             return {
-                "success": result.returncode == 0,
-                "total_issues": len(issues),
-                "issues": issues,
-                "raw_output": result.stdout,
-                "raw_errors": result.stderr
+                "success": False,
+                "error": str(e),
+                "issues": []
             }
 
+    async def lint_async(self, format: str = "json", source: Optional[str] = None) -> Dict[str, Any]:
+        """Run buf lint without blocking the event loop (see lint)"""
+        try:
+            returncode, stdout, stderr = await _run_async(
+                self._lint_cmd(format, source), self.workspace_path
+            )
+            return self._parse_lint(returncode, stdout, stderr, format)
+
         except Exception as e:
             logger.error(f"Buf lint failed: {e}")
             return {
@@ -139,81 +253,73 @@ class BufIntegration:
                 "issues": []
             }
 
+    @staticmethod
+    def _lint_cmd(format: str, source: Optional[str]) -> List[str]:
+        """Build the buf lint command"""
+        cmd = [_buf_executable(), "lint"]
+        if source:
+            cmd.append(source)
+        if format == "json":
+            cmd.append("--error-format=json")
+        return cmd
+
+    @staticmethod
+    def _parse_lint(returncode: int, stdout: bytes, stderr: bytes, format: str) -> Dict[str, Any]:
+        """Parse buf lint output into a result dictionary"""
+        issues = []
+        if format == "json" and stderr:
+            # Parse JSON output straight from bytes; the decoder yields str fields
+            try:
+                for line in stderr.splitlines():
+                    if line:
+                        issues.append(BufLintIssue(*_issue_fields(_json_loads(line)), "ERROR"))
+            except json.JSONDecodeError:
+                logger.warning("Failed to parse JSON lint output")
+
+        return {
+            "success": returncode == 0,
+            "total_issues": len(issues),
+            "issues": issues,
+            "raw_output": _decode(stdout),
+            "raw_errors": _decode(stderr)
+        }
+
     def breaking_check(self, against: str = "HEAD~1",
-                      config: Optional[str] = None) -> Dict[str, Any]:
+                      config: Optional[str] = None,
+                      source: Optional[str] = None) -> Dict[str, Any]:
         """
         Check for breaking changes with detailed parsing
 
         Args:
             against: Git reference or directory to compare against
             config: Optional path to breaking configuration
+            source: Optional input to check (e.g. a prebuilt image) instead of the workspace
 
         Returns:
             Dictionary containing breaking change analysis
         """
         try:
-            cmd = ["buf", "breaking"]
-
-            # Handle different comparison targets
-            if against.startswith(".git"):
-                cmd.extend(["--against", against])
-            elif against.startswith("http"):
-                # Remote repository
-                cmd.extend(["--against", against])
-            else:
-                # Git reference
-                cmd.extend(["--against", f".git#{against}"])
-
-            if config:
-                cmd.extend(["--config", config])
-
-            cmd.append("--error-format=json")
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
-
-            breaking_changes = []
-            if result.stderr:
-                # Parse JSON output
-                try:
-                    for line in result.stderr.strip().split('\n'):
-                        if line:
-                            change_data = json.loads(line)
-                            breaking_changes.append(BufBreakingChange(
-                                file=change_data.get("path", ""),
-                                line=change_data.get("start_line", 0),
-                                column=change_data.get("start_column", 0),
-                                type=change_data.get("type", ""),
-                                message=change_data.get("message", ""),
-                                category=self._categorize_breaking_change(change_data.get("type", ""))
-                            ))
-                except json.JSONDecodeError:
-                    # Fallback to text parsing
-                    for line in result.stderr.strip().split('\n'):
-                        if line and not line.startswith('buf:'):
-                            breaking_changes.append(BufBreakingChange(
-                                file="",
-                                line=0,
-                                column=0,
-                                type="UNKNOWN",
-                                message=line,
-                                category="UNKNOWN"
-                            ))
+            result = _run(self._breaking_cmd(against, config, source), self.workspace_path)
+            return self._parse_breaking(result.returncode, result.stdout, result.stderr)
 
+        except Exception as e:
+            logger.error(f"Buf breaking check failed: {e}")
             return {
-                "success": result.returncode == 0,
-                "has_breaking_changes": len(breaking_changes) > 0,
-                "total_breaking_changes": len(breaking_changes),
-                "breaking_changes": breaking_changes,
-                "categories": self._group_by_category(breaking_changes),
-                "raw_output": result.stdout,
-                "raw_errors": result.stderr
+                "success": False,
+                "error": str(e),
+                "breaking_changes": []
             }
 
+    async def breaking_check_async(self, against: str = "HEAD~1",
+                                   config: Optional[str] = None,
+                                   source: Optional[str] = None) -> Dict[str, Any]:
+        """Check for breaking changes without blocking the event loop (see breaking_check)"""
+        try:
+            returncode, stdout, stderr = await _run_async(
+                self._breaking_cmd(against, config, source), self.workspace_path
+            )
+            return self._parse_breaking(returncode, stdout, stderr)
+
         except Exception as e:
             logger.error(f"Buf breaking check failed: {e}")
             return {
@@ -222,39 +328,156 @@ class BufIntegration:
                 "breaking_changes": []
             }
 
-    def _categorize_breaking_change(self, change_type: str) -> str:
-        """Categorize breaking change type"""
-        categories = {
-            "FIELD_SAME_NUMBER": "field_number",
-            "FIELD_NO_DELETE": "field_removal",
-            "FIELD_SAME_TYPE": "field_type",
-            "FIELD_SAME_NAME": "field_rename",
-            "FIELD_SAME_ONEOF": "oneof_change",
-            "ENUM_VALUE_NO_DELETE": "enum_removal",
-            "ENUM_VALUE_SAME_NUMBER": "enum_number",
-            "RPC_NO_DELETE": "rpc_removal",
-            "RPC_SAME_REQUEST_TYPE": "rpc_request",
-            "RPC_SAME_RESPONSE_TYPE": "rpc_response",
-            "RPC_SAME_CLIENT_STREAMING": "rpc_streaming",
-            "RPC_SAME_SERVER_STREAMING": "rpc_streaming",
-            "PACKAGE_NO_DELETE": "package_removal",
-            "SERVICE_NO_DELETE": "service_removal"
+    def iter_breaking_changes(self, against: str = "HEAD~1",
+                              config: Optional[str] = None,
+                              source: Optional[str] = None) -> Iterator[BufBreakingChange]:
+        """
+        Stream breaking changes as buf reports them
+
+        Unlike breaking_check, the output is never buffered as a whole, so memory
+        stays bounded on modules with very many breaking changes.
+
+        Args:
+            against: Git reference or directory to compare against
+            config: Optional path to breaking configuration
+            source: Optional input to check (e.g. a prebuilt image) instead of the workspace
+
+        Yields:
+            Each breaking change as soon as its line is read
+
+        Raises:
+            RuntimeError: If buf cannot be run, or exits non-zero without reporting
+                any breaking change as JSON
+        """
+        try:
+            proc = subprocess.Popen(
+                self._breaking_cmd(against, config, source),
+                cwd=self.workspace_path,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                close_fds=False
+            )
+        except OSError as e:
+            raise RuntimeError(f"buf breaking failed: {e}") from e
+
+        with proc:
+            # Text lines are held back until buf has reported a change as JSON, since
+            # until then they may be the error of a run that failed outright
+            reported = False
+            pending: List[BufBreakingChange] = []
+            for line in proc.stderr:
+                change = self._parse_breaking_line(line.rstrip(b"\n"))
+                if change is None:
+                    continue
+                if change.type == "UNKNOWN" and not reported:
+                    pending.append(change)
+                    continue
+                if not reported:
+                    reported = True
+                    yield from pending
+                    pending.clear()
+                yield change
+            proc.wait()
+
+        if pending and proc.returncode != 0:
+            raise RuntimeError("buf breaking failed: " + "; ".join(c.message for c in pending))
+        yield from pending
+
+    @staticmethod
+    def _breaking_cmd(against: str, config: Optional[str], source: Optional[str]) -> List[str]:
+        """Build the buf breaking command"""
+        cmd = [_buf_executable(), "breaking"]
+        if source:
+            cmd.append(source)
+        cmd.extend(["--against", BufIntegration._against_input(against)])
+
+        if config:
+            cmd.extend(["--config", config])
+
+        cmd.append("--error-format=json")
+        return cmd
+
+    @staticmethod
+    def _against_input(against: str) -> str:
+        """Map a comparison target to a buf input"""
+        # Handle different comparison targets
+        if against.startswith(".git"):
+            return against
+        elif against.startswith("http"):
+            # Remote repository
+            return against
+        elif against.endswith(IMAGE_SUFFIXES):
+            # Prebuilt image
+            return against
+        else:
+            # Git reference
+            return f".git#{against}"
+
+    def _parse_breaking_line(self, line: bytes) -> Optional[BufBreakingChange]:
+        """Parse one line of buf breaking output, or return None if it reports nothing
+
+        Lines that are not JSON become UNKNOWN changes carrying the text, except
+        buf's own "buf:" status lines.
+        """
+        if not line:
+            return None
+        try:
+            # Parse JSON straight from bytes; the decoder yields str fields
+            fields = _issue_fields(_json_loads(line))
+        except json.JSONDecodeError:
+            if line.startswith(b'buf:'):
+                return None
+            return BufBreakingChange(
+                file="",
+                line=0,
+                column=0,
+                type="UNKNOWN",
+                message=_decode(line),
+                category="UNKNOWN"
+            )
+        return BufBreakingChange(*fields, self._categorize_breaking_change(fields[3]))
+
+    def _parse_breaking(self, returncode: int, stdout: bytes, stderr: bytes) -> Dict[str, Any]:
+        """Parse buf breaking output into a result dictionary"""
+        breaking_changes = [
+            change for change in map(self._parse_breaking_line, stderr.splitlines())
+            if change is not None
+        ]
+
+        if returncode != 0 and all(change.type == "UNKNOWN" for change in breaking_changes):
+            # buf failed before checking anything, so its text is an error, not breaking changes
+            return {
+                "success": False,
+                "error": _decode(stderr).strip() or f"buf breaking exited with code {returncode}",
+                "has_breaking_changes": False,
+                "total_breaking_changes": 0,
+                "breaking_changes": [],
+                "categories": {},
+                "raw_output": _decode(stdout),
+                "raw_errors": _decode(stderr)
+            }
+
+        return {
+            "success": returncode == 0,
+            "has_breaking_changes": len(breaking_changes) > 0,
+            "total_breaking_changes": len(breaking_changes),
+            "breaking_changes": breaking_changes,
+            "categories": self._group_by_category(breaking_changes),
+            "raw_output": _decode(stdout),
+            "raw_errors": _decode(stderr)
         }
 
-        for key, category in categories.items():
-            if key in change_type:
-                return category
-        return "other"
+    def _categorize_breaking_change(self, change_type: str) -> str:
+        """Categorize breaking change type"""
+        match = BREAKING_CATEGORY_PATTERN.search(change_type)
+        return BREAKING_CATEGORIES[match.group(0)] if match else "other"
 
     def _group_by_category(self, changes: List[BufBreakingChange]) -> Dict[str, List[BufBreakingChange]]:
         """Group breaking changes by category"""
-        grouped = {}
+        grouped = defaultdict(list)
         for change in changes:
-            category = change.category
-            if category not in grouped:
-                grouped[category] = []
-            grouped[category].append(change)
-        return grouped
+            grouped[change.category].append(change)
+        return dict(grouped)
 
     def format_check(self, fix: bool = False) -> Dict[str, Any]:
         """
@@ -267,26 +490,22 @@ class BufIntegration:
             Dictionary containing format check results
         """
         try:
-            cmd = ["buf", "format"]
-            if not fix:
-                cmd.append("--diff")
-            else:
-                cmd.extend(["-w"])
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
+            result = _run(self._format_cmd(fix), self.workspace_path)
+            return self._parse_format(result.returncode, result.stdout, result.stderr, fix)
 
+        except Exception as e:
+            logger.error(f"Buf format failed: {e}")
             return {
-                "success": result.returncode == 0,
-                "formatted": fix and result.returncode == 0,
-                "diff": result.stdout if not fix else "",
-                "errors": result.stderr
+                "success": False,
+                "error": str(e)
             }
 
+    async def format_check_async(self, fix: bool = False) -> Dict[str, Any]:
+        """Check or fix formatting without blocking the event loop (see format_check)"""
+        try:
+            returncode, stdout, stderr = await _run_async(self._format_cmd(fix), self.workspace_path)
+            return self._parse_format(returncode, stdout, stderr, fix)
+
         except Exception as e:
             logger.error(f"Buf format failed: {e}")
             return {
@@ -294,6 +513,106 @@ class BufIntegration:
                 "error": str(e)
             }
 
+    @staticmethod
+    def _format_cmd(fix: bool) -> List[str]:
+        """Build the buf format command"""
+        cmd = [_buf_executable(), "format"]
+        if not fix:
+            cmd.append("--diff")
+        else:
+            cmd.extend(["-w"])
+        return cmd
+
+    @staticmethod
+    def _parse_format(returncode: int, stdout: bytes, stderr: bytes, fix: bool) -> Dict[str, Any]:
+        """Build the format check result dictionary"""
+        return {
+            "success": returncode == 0,
+            "formatted": fix and returncode == 0,
+            "diff": _decode(stdout) if not fix else "",
+            "errors": _decode(stderr)
+        }
+
+    async def run_checks_parallel(self, against: str = "HEAD~1") -> Dict[str, Any]:
+        """
+        Run lint, breaking and format checks concurrently
+
+        Args:
+            against: Git reference to compare against for the breaking check
+
+        Returns:
+            Dictionary of results keyed by check name
+        """
+        lint, breaking, format = await asyncio.gather(
+            self.lint_async(),
+            self.breaking_check_async(against),
+            self.format_check_async()
+        )
+        return {"lint": lint, "breaking": breaking, "format": format}
+
+    async def breaking_check_multi(self, against_refs: List[str],
+                                   config: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Check for breaking changes against several baselines at once
+
+        The workspace and every baseline are built into images concurrently,
+        once each; the comparisons then run concurrently between images, so buf
+        neither re-parses the workspace nor re-resolves git per baseline.
+
+        Args:
+            against_refs: Git references (or other inputs) to compare against
+            config: Optional path to breaking configuration
+
+        Returns:
+            Dictionary of breaking_check results keyed by reference
+        """
+        loop = asyncio.get_running_loop()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            scratch = Path(tmp_dir)
+            current = scratch / "current.binpb"
+            ref_images = {ref: scratch / f"ref{i}.binpb" for i, ref in enumerate(against_refs)}
+
+            async def build_ref(ref: str, image: Path) -> Optional[Dict[str, Any]]:
+                """Build one baseline image, returning an error result if that fails"""
+                try:
+                    returncode, _, stderr = await _run_async(
+                        [_buf_executable(), "build", self._against_input(ref), "-o", str(image)],
+                        self.workspace_path
+                    )
+                except Exception as e:
+                    logger.error(f"buf build of {ref} failed: {e}")
+                    error = str(e)
+                else:
+                    if returncode == 0:
+                        return None
+                    error = _decode(stderr)
+                return {
+                    "success": False,
+                    "error": f"Failed to build {ref}: {error}",
+                    "breaking_changes": []
+                }
+
+            # The workspace build goes through build_image to reuse its content-hash cache
+            builds = await asyncio.gather(
+                loop.run_in_executor(None, self.build_image, current),
+                *(build_ref(ref, image) for ref, image in ref_images.items())
+            )
+            if not builds[0]["success"]:
+                return {ref: builds[0] for ref in against_refs}
+
+            results = {}
+            pending = {}
+            for (ref, image), failure in zip(ref_images.items(), builds[1:]):
+                if failure is None:
+                    pending[ref] = self.breaking_check_async(str(image), config, source=str(current))
+                else:
+                    results[ref] = failure
+
+            for ref, result in zip(pending, await asyncio.gather(*pending.values())):
+                results[ref] = result
+
+        return {ref: results[ref] for ref in against_refs}
+
     def generate(self, template: Optional[str] = None,
                  output_dir: Optional[Path] = None) -> Dict[str, Any]:
         """
@@ -307,7 +626,7 @@ class BufIntegration:
             Dictionary containing generation results
         """
         try:
-            cmd = ["buf", "generate"]
+            cmd = [_buf_executable(), "generate"]
 
             if template:
                 cmd.extend(["--template", template])
@@ -315,12 +634,7 @@ class BufIntegration:
             if output_dir:
                 cmd.extend(["-o", str(output_dir)])
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
+            result = _run(cmd, self.workspace_path, text=True)
 
             return {
                 "success": result.returncode == 0,
@@ -346,14 +660,9 @@ class BufIntegration:
             Dictionary containing export results
         """
         try:
-            cmd = ["buf", "export", "-o", str(output_file)]
+            cmd = [_buf_executable(), "export", "-o", str(output_file)]
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
+            result = _run(cmd, self.workspace_path, text=True)
 
             return {
                 "success": result.returncode == 0,
@@ -376,14 +685,9 @@ class BufIntegration:
             Dictionary containing update results
         """
         try:
-            cmd = ["buf", "mod", "update"]
+            cmd = [_buf_executable(), "mod", "update"]
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
+            result = _run(cmd, self.workspace_path, text=True)
 
             return {
                 "success": result.returncode == 0,
@@ -398,34 +702,78 @@ class BufIntegration:
                 "error": str(e)
             }
 
-    def build_image(self, output: Optional[Path] = None) -> Dict[str, Any]:
+    @staticmethod
+    def _workspace_hash(root: Path) -> str:
+        """Hash the buf version, the proto sources and every module's buf configuration"""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(_buf_version().encode())
+        digest.update(b"\0")
+
+        files = []
+        for directory, dirs, names in os.walk(root):
+            # Prune excluded and hidden directories before descending into them
+            dirs[:] = [d for d in dirs if d not in HASH_EXCLUDE_DIRS and not d.startswith(".")]
+            files.extend(
+                os.path.join(directory, name) for name in names
+                if name.endswith(".proto") or name in BUF_CONFIG_FILES
+            )
+
+        for path in sorted(files):
+            digest.update(os.path.relpath(path, root).encode())
+            digest.update(b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def build_image(self, output: Optional[Path] = None, use_cache: bool = True,
+                    cwd: Optional[Path] = None) -> Dict[str, Any]:
         """
         Build buf image for the module
 
         Args:
             output: Optional path to save the image
+            use_cache: Reuse a previously built image if the sources are unchanged
+            cwd: Module directory to build instead of the workspace
 
         Returns:
             Dictionary containing build results
         """
+        cwd = cwd or self.workspace_path
         try:
-            cmd = ["buf", "build"]
+            cached = None
+            if output and use_cache:
+                cached = IMAGE_CACHE_DIR / f"{self._workspace_hash(cwd)}.bin"
+                if cached.is_file():
+                    shutil.copyfile(cached, output)
+                    return {
+                        "success": True,
+                        "image_path": str(output),
+                        "output": "",
+                        "errors": "",
+                        "cached": True
+                    }
+
+            cmd = [_buf_executable(), "build"]
 
             if output:
                 cmd.extend(["-o", str(output)])
 
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_path,
-                capture_output=True,
-                text=True
-            )
+            result = _run(cmd, cwd, text=True)
+
+            if cached and result.returncode == 0:
+                # Write under a temporary name so concurrent readers never see a partial image
+                IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                partial = cached.with_suffix(f".{os.getpid()}.tmp")
+                shutil.copyfile(output, partial)
+                os.replace(partial, cached)
 
             return {
                 "success": result.returncode == 0,
                 "image_path": str(output) if output and result.returncode == 0 else None,
                 "output": result.stdout,
-                "errors": result.stderr
+                "errors": result.stderr,
+                "cached": False
             }
 
         except Exception as e:
@@ -447,34 +795,29 @@ class BufIntegration:
             Dictionary containing comparison results
         """
         try:
-            # Build images if needed
-            with tempfile.NamedTemporaryFile(suffix=".bin") as tmp1, \
-                 tempfile.NamedTemporaryFile(suffix=".bin") as tmp2:
+            # A scratch directory is only created when an input needs building
+            with contextlib.ExitStack() as stack:
+                scratch = None
+                if image1.is_dir() or image2.is_dir():
+                    scratch = Path(stack.enter_context(tempfile.TemporaryDirectory()))
 
                 # If paths are directories, build images
                 if image1.is_dir():
-                    build1 = self.build_image(Path(tmp1.name))
+                    build1 = self.build_image(scratch / "image1.bin")
                     if not build1["success"]:
                         return build1
-                    image1 = Path(tmp1.name)
+                    image1 = scratch / "image1.bin"
 
                 if image2.is_dir():
-                    original_dir = self.workspace_path
-                    self.workspace_path = image2
-                    build2 = self.build_image(Path(tmp2.name))
-                    self.workspace_path = original_dir
+                    build2 = self.build_image(scratch / "image2.bin", cwd=image2)
                     if not build2["success"]:
                         return build2
-                    image2 = Path(tmp2.name)
+                    image2 = scratch / "image2.bin"
 
                 # Compare images
-                cmd = ["buf", "breaking", str(image1), "--against", str(image2)]
+                cmd = [_buf_executable(), "breaking", str(image1), "--against", str(image2)]
 
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True
-                )
+                result = _run(cmd, text=True)
 
                 return {
                     "success": result.returncode == 0,
@@ -490,6 +833,38 @@ class BufIntegration:
                 "error": str(e)
             }
 
+    def run_all(self, checks: Tuple[str, ...] = ("lint", "breaking", "format"),
+                against: str = "HEAD~1") -> Dict[str, Any]:
+        """
+        Run several checks while parsing the proto sources only once
+
+        The module is built into an image with a single ``buf build``; lint and
+        breaking then read that image instead of re-parsing the sources.
+        Formatting works on source files, so it still runs against the workspace.
+
+        Args:
+            checks: Checks to run (any of lint, breaking, format)
+            against: Git reference to compare against for the breaking check
+
+        Returns:
+            Dictionary of results keyed by check name, plus the build result
+        """
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image = Path(tmp_dir) / "image.binpb"
+            results["build"] = self.build_image(image)
+            if not results["build"]["success"]:
+                return results
+
+            if "lint" in checks:
+                results["lint"] = self.lint(source=str(image))
+            if "breaking" in checks:
+                results["breaking"] = self.breaking_check(against, source=str(image))
+            if "format" in checks:
+                results["format"] = self.format_check()
+
+        return results
+
     def get_file_dependencies(self, proto_file: str) -> List[str]:
         """
         Get dependencies of a specific proto file
@@ -501,23 +876,13 @@ class BufIntegration:
             List of dependency file paths
         """
         try:
-            # Use buf to analyze dependencies
             full_path = self.workspace_path / proto_file
+            if not full_path.exists():
+                return []
 
-            # Parse imports from the file
-            dependencies = []
-            if full_path.exists():
-                content = full_path.read_text()
-                import_lines = [line for line in content.split('\n')
-                              if line.strip().startswith('import')]
-
-                for line in import_lines:
-                    # Extract import path
-                    import_match = re.search(r'import\s+"([^"]+)"', line)
-                    if import_match:
-                        dependencies.append(import_match.group(1))
-
-            return dependencies
+            # Unchanged files are served from the cache
+            stat = full_path.stat()
+            return list(_parse_imports(str(full_path), stat.st_mtime_ns, stat.st_size))
 
         except Exception as e:
             logger.error(f"Failed to get file dependencies: {e}")
@@ -543,16 +908,13 @@ def create_breaking_config(output_path: Path, strict: bool = False) -> Path:
     }
 
     with open(output_path, 'w') as f:
-        import yaml
-        yaml.dump(config, f)
+        yaml.dump(config, f, Dumper=YAML_DUMPER)
 
     return output_path
 
 
 if __name__ == "__main__":
     # Example usage
-    import sys
-
     if len(sys.argv) < 2:
         print("Usage: buf_integration.py <workspace_path>")
         sys.exit(1)
@@ -560,15 +922,18 @@ if __name__ == "__main__":
     workspace = Path(sys.argv[1])
     buf = BufIntegration(workspace)
 
-    # Run lint
-    print("Running lint...")
-    lint_results = buf.lint()
+    # Run lint and breaking checks against a single build of the module
+    print("Running lint and breaking checks...")
+    results = buf.run_all(checks=("lint", "breaking"))
+    if not results["build"]["success"]:
+        print(f"Build failed: {results['build'].get('errors') or results['build'].get('error')}")
+        sys.exit(1)
+
+    lint_results = results["lint"]
     print(f"Lint issues: {lint_results['total_issues']}")
 
-    # Check breaking changes
-    print("\nChecking breaking changes...")
-    breaking_results = buf.breaking_check()
-    print(f"Breaking changes: {breaking_results['total_breaking_changes']}")
+    breaking_results = results["breaking"]
+    print(f"\nBreaking changes: {breaking_results['total_breaking_changes']}")
 
     if breaking_results['breaking_changes']:
         print("\nBreaking changes by category:")
@@ -0,0 +1,11 @@
+"""
+Compatibility shims shared by the checker modules
+
+Kept free of third-party imports so every module, including the lightweight
+CLI tools, can use it without pulling in LangChain or MCP.
+"""
+
+import sys
+
+# dataclass(slots=True) is only available on Python 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -7,12 +7,22 @@ and understand API contracts through the MCP protocol.
 """
 
 import asyncio
+import filecmp
+import io
 import json
 import logging
+import mmap
+import os
 import re
-from dataclasses import dataclass, asdict
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from compat import DATACLASS_SLOTS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -37,21 +47,128 @@ except ImportError:
         class TextContent:
             pass
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dump_json(obj: Any) -> str:
+    """Serialize a tool result as indented JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        # orjson serializes dataclasses natively
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, default=asdict)
+
+
+def _dump_compact(obj: Any) -> str:
+    """Serialize a single record as one line of JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, default=asdict)
+
+
+def dump_json_records(result: Dict[str, Any], records_key: str) -> str:
+    """
+    Serialize a tool result like dump_json, streaming its largest list
+
+    The list under records_key is written one compact record per line, so a
+    result with a very large list is encoded record by record instead of as
+    a single indented document.
+    """
+    if not result:
+        return "{}"
+
+    out = io.StringIO()
+    out.write("{")
+    for i, (key, value) in enumerate(result.items()):
+        out.write(",\n  " if i else "\n  ")
+        out.write(f"{json.dumps(key)}: ")
+        if key == records_key:
+            out.write("[")
+            for j, record in enumerate(value):
+                out.write(",\n    " if j else "\n    ")
+                out.write(_dump_compact(record))
+            out.write("\n  ]" if value else "]")
+        else:
+            out.write(dump_json(value).replace("\n", "\n  "))
+    out.write("\n}")
+    return out.getvalue()
+
+
+# Proto syntax patterns, compiled once at import. Files are parsed as raw bytes,
+# so only the captured identifiers are ever decoded.
+FIELD_PATTERN = re.compile(
+    rb'\s*(optional|required|repeated)?\s*(\w+(?:\.\w+)*)\s+(\w+)\s*=\s*(\d+)'
+)
+RPC_PATTERN = re.compile(
+    rb'rpc\s+(\w+)\s*\(\s*(\w+(?:\.\w+)*)\s*\)\s*returns\s*\(\s*(\w+(?:\.\w+)*)\s*\)'
+)
+IMPORT_PATTERN = re.compile(rb'import\s+"([^"]+)"')
+PACKAGE_PATTERN = re.compile(rb'package\s+([\w.]+);')
+OPTION_PATTERN = re.compile(rb'option\s+(\w+)\s*=\s*"([^"]+)"')
+ENUM_VALUE_PATTERN = re.compile(rb'\s*(\w+)\s*=\s*(\d+)')
+
+# Comments (blanked before parsing) and the string literals that may contain comment markers
+COMMENT_PATTERN = re.compile(
+    rb'("(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')|//[^\n]*|/\*.*?(?:\*/|\Z)', re.DOTALL
+)
+NON_NEWLINE_PATTERN = re.compile(rb'[^\n]')
+# Tokens that delimit blocks and statements; string literals are matched so their contents are skipped
+STRUCTURE_PATTERN = re.compile(rb'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|[{};]')
+STATEMENT_PATTERN = re.compile(rb'[{};]')
+BLOCK_KEYWORDS = frozenset({b"message", b"enum", b"service", b"oneof", b"extend"})
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ProtoField:
+    """Represents a field of a protobuf message"""
+    modifier: str
+    type: str
+    name: str
+    number: int
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ProtoRpc:
+    """Represents an RPC of a protobuf service"""
+    name: str
+    request: str
+    response: str
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ProtoEnumValue:
+    """Represents a value of a protobuf enum"""
+    name: str
+    number: int
+
 
 @dataclass
 class ProtoMessage:
     """Represents a protobuf message"""
     name: str
-    fields: List[Dict[str, Any]]
+    fields: List[ProtoField]
     nested_messages: List['ProtoMessage']
     enums: List[Dict[str, Any]]
 
+    @cached_property
+    def field_index(self) -> Dict[str, ProtoField]:
+        """Fields by name, built once since parsed messages are not modified"""
+        return {f.name: f for f in self.fields}
+
 
 @dataclass
 class ProtoService:
     """Represents a protobuf service"""
     name: str
-    rpcs: List[Dict[str, Any]]
+    rpcs: List[ProtoRpc]
+
+    @cached_property
+    def rpc_index(self) -> Dict[str, ProtoRpc]:
+        """RPCs by name, built once since parsed services are not modified"""
+        return {r.name: r for r in self.rpcs}
 
 
 @dataclass
@@ -64,39 +181,170 @@ class ProtoFile:
     enums: List[Dict[str, Any]]
     options: Dict[str, str]
 
+    @cached_property
+    def message_index(self) -> Dict[str, ProtoMessage]:
+        """Top-level messages by name, built once since parsed files are not modified"""
+        return {m.name: m for m in self.messages}
+
+    @cached_property
+    def service_index(self) -> Dict[str, ProtoService]:
+        """Services by name, built once since parsed files are not modified"""
+        return {s.name: s for s in self.services}
+
+
+@dataclass
+class _Block:
+    """A brace-delimited block located by the scanner, with its body span"""
+    kind: str
+    name: str
+    start: int
+    end: int
+    children: List['_Block'] = field(default_factory=list)
+
+
+def _identifier(raw: bytes) -> str:
+    """Decode an identifier and intern it, so repeated names share one object and compare by identity"""
+    return sys.intern(raw.decode())
+
+
+def _blank_comment(match: re.Match) -> bytes:
+    """Replace a comment with spaces (keeping newlines) but leave string literals intact"""
+    if match.group(1) is not None:
+        return match.group(1)
+    return NON_NEWLINE_PATTERN.sub(b" ", match.group(0))
+
+
+def _strip_comments(content: bytes) -> bytes:
+    """Blank out the comments of proto source, keeping offsets and string literals intact"""
+    # Substring checks are far cheaper than the substitution, which comment-free files can skip
+    if content.find(b"//") != -1 or content.find(b"/*") != -1:
+        return COMMENT_PATTERN.sub(_blank_comment, content)
+    return content
+
+
+def _scan(code: bytes) -> _Block:
+    """Locate every block of comment-free proto source in one pass, tracking nesting depth"""
+    root = _Block(kind="", name="", start=0, end=len(code))
+    stack = [root]
+    statement_start = 0
+
+    for match in STRUCTURE_PATTERN.finditer(code):
+        token = match.group(0)
+        if token == b"{":
+            # The block header is the statement text leading up to the brace
+            words = code[statement_start:match.start()].split()
+            if len(words) >= 2 and words[0] in BLOCK_KEYWORDS:
+                kind, name = _identifier(words[0]), _identifier(words[1])
+            else:
+                kind, name = "", ""
+            block = _Block(kind=kind, name=name, start=match.end(), end=len(code))
+            stack[-1].children.append(block)
+            stack.append(block)
+        elif token == b"}":
+            if len(stack) > 1:
+                stack.pop().end = match.start()
+        elif token != b";":
+            # String literal
+            continue
+        statement_start = match.end()
+
+    return root
+
+
+def _statement_spans(code: bytes, block: _Block) -> Iterator[Tuple[int, int]]:
+    """Yield the (start, end) spans of a block's statements, excluding nested blocks other than oneofs"""
+    segments = []
+    pos = block.start
+    for child in block.children:
+        if child.kind == "oneof":
+            continue
+        # Segments end at the child's "{" and resume at its "}", so no statement spans a gap
+        segments.append((pos, child.start))
+        pos = child.end
+    segments.append((pos, block.end))
+
+    find_delimiters = STATEMENT_PATTERN.finditer
+    for segment_start, segment_end in segments:
+        start = segment_start
+        for match in find_delimiters(code, segment_start, segment_end):
+            yield start, match.start()
+            start = match.end()
+        yield start, segment_end
+
 
 class ProtoParser:
     """Parser for protobuf files"""
 
     def __init__(self):
-        self.field_pattern = re.compile(
-            r'^\s*(optional|required|repeated)?\s*(\w+(?:\.\w+)*)\s+(\w+)\s*=\s*(\d+)'
-        )
-        self.rpc_pattern = re.compile(
-            r'rpc\s+(\w+)\s*\(\s*(\w+(?:\.\w+)*)\s*\)\s*returns\s*\(\s*(\w+(?:\.\w+)*)\s*\)'
-        )
-        self.import_pattern = re.compile(r'import\s+"([^"]+)"')
-        self.package_pattern = re.compile(r'package\s+([\w.]+);')
-        self.option_pattern = re.compile(r'option\s+(\w+)\s*=\s*"([^"]+)"')
+        self.field_pattern = FIELD_PATTERN
+        self.rpc_pattern = RPC_PATTERN
+        self.import_pattern = IMPORT_PATTERN
+        self.package_pattern = PACKAGE_PATTERN
+        self.option_pattern = OPTION_PATTERN
+        # Parsed files (and imports-only parses) by path, with the (mtime_ns, size) they were parsed at
+        self._cache: Dict[str, Tuple[Tuple[int, int], ProtoFile]] = {}
+        self._imports_cache: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+
+    @staticmethod
+    def _cache_key(file_path: Path) -> Tuple[str, Tuple[int, int]]:
+        """Return the cache key of a file and the (mtime_ns, size) stamp of its current contents"""
+        stat = file_path.stat()
+        return str(file_path.resolve()), (stat.st_mtime_ns, stat.st_size)
 
     def parse_file(self, file_path: Path) -> ProtoFile:
-        """Parse a proto file"""
-        content = file_path.read_text()
+        """Parse a proto file, reusing the previous result while the file is unchanged"""
+        key, stamp = self._cache_key(file_path)
+        cached = self._cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        # Parse straight from a read-only mapping instead of reading and decoding a copy
+        with open(file_path, "rb") as f:
+            if stamp[1] == 0:
+                # Empty files cannot be mapped
+                proto_file = self._parse_content(b"")
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    proto_file = self._parse_content(content)
+        self._cache[key] = (stamp, proto_file)
+        return proto_file
+
+    def parse_imports(self, file_path: Path) -> List[str]:
+        """Extract only the imports of a proto file, skipping message/service/enum parsing"""
+        key, stamp = self._cache_key(file_path)
+        # A full parse of the same contents already has them
+        parsed = self._cache.get(key)
+        if parsed and parsed[0] == stamp:
+            return parsed[1].imports
+        cached = self._imports_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        code = _strip_comments(file_path.read_bytes())
+        imports = [imp.decode() for imp in self.import_pattern.findall(code)]
+        self._imports_cache[key] = (stamp, imports)
+        return imports
+
+    def _parse_content(self, content: bytes) -> ProtoFile:
+        """Parse the raw contents of a proto file (bytes or a memory map)"""
+        code = _strip_comments(content)
+        root = _scan(code)
 
         # Extract package
-        package_match = self.package_pattern.search(content)
-        package = package_match.group(1) if package_match else ""
+        package_match = self.package_pattern.search(code)
+        package = package_match.group(1).decode() if package_match else ""
 
         # Extract imports
-        imports = self.import_pattern.findall(content)
+        imports = [imp.decode() for imp in self.import_pattern.findall(code)]
 
         # Extract options
-        options = dict(self.option_pattern.findall(content))
+        options = {
+            name.decode(): value.decode()
+            for name, value in self.option_pattern.findall(code)
+        }
 
         # Parse messages, services, and enums
-        messages = self._parse_messages(content)
-        services = self._parse_services(content)
-        enums = self._parse_enums(content)
+        messages, services, enums = self._parse_definitions(code, root)
 
         return ProtoFile(
             package=package,
@@ -107,83 +355,75 @@ class ProtoParser:
             options=options
         )
 
-    def _parse_messages(self, content: str) -> List[ProtoMessage]:
-        """Parse message definitions"""
+    def _parse_definitions(self, code: bytes, parent: _Block) -> Tuple[
+            List[ProtoMessage], List[ProtoService], List[Dict[str, Any]]]:
+        """Parse the messages, services and enums directly inside a block in one pass"""
         messages = []
-        message_pattern = re.compile(r'message\s+(\w+)\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}', re.MULTILINE | re.DOTALL)
-
-        for match in message_pattern.finditer(content):
-            name = match.group(1)
-            body = match.group(2)
-
-            fields = []
-            for field_match in self.field_pattern.finditer(body):
-                fields.append({
-                    "modifier": field_match.group(1) or "optional",
-                    "type": field_match.group(2),
-                    "name": field_match.group(3),
-                    "number": int(field_match.group(4))
-                })
-
-            # Parse nested messages recursively
-            nested_messages = self._parse_messages(body)
-
-            # Parse nested enums
-            enums = self._parse_enums(body)
-
-            messages.append(ProtoMessage(
-                name=name,
-                fields=fields,
-                nested_messages=nested_messages,
-                enums=enums
-            ))
-
-        return messages
-
-    def _parse_services(self, content: str) -> List[ProtoService]:
-        """Parse service definitions"""
         services = []
-        service_pattern = re.compile(r'service\s+(\w+)\s*\{([^}]*)\}', re.MULTILINE | re.DOTALL)
-
-        for match in service_pattern.finditer(content):
-            name = match.group(1)
-            body = match.group(2)
-
-            rpcs = []
-            for rpc_match in self.rpc_pattern.finditer(body):
-                rpcs.append({
-                    "name": rpc_match.group(1),
-                    "request": rpc_match.group(2),
-                    "response": rpc_match.group(3)
-                })
+        enums = []
 
-            services.append(ProtoService(name=name, rpcs=rpcs))
+        for block in parent.children:
+            if block.kind == "message":
+                messages.append(self._parse_message(code, block))
+            elif block.kind == "enum":
+                enums.append(self._parse_enum(code, block))
+            elif block.kind == "service":
+                services.append(self._parse_service(code, block))
+
+        return messages, services, enums
+
+    def _parse_message(self, code: bytes, block: _Block) -> ProtoMessage:
+        """Parse a message definition"""
+        fields = []
+        match_field = self.field_pattern.match
+        for start, end in _statement_spans(code, block):
+            field_match = match_field(code, start, end)
+            if field_match:
+                fields.append(ProtoField(
+                    modifier=_identifier(field_match.group(1) or b"optional"),
+                    type=_identifier(field_match.group(2)),
+                    name=_identifier(field_match.group(3)),
+                    number=int(field_match.group(4))
+                ))
+
+        # Parse nested messages and enums recursively
+        nested_messages, _, enums = self._parse_definitions(code, block)
+
+        return ProtoMessage(
+            name=block.name,
+            fields=fields,
+            nested_messages=nested_messages,
+            enums=enums
+        )
 
-        return services
+    def _parse_service(self, code: bytes, block: _Block) -> ProtoService:
+        """Parse a service definition"""
+        rpcs = []
+        for rpc_match in self.rpc_pattern.finditer(code, block.start, block.end):
+            rpcs.append(ProtoRpc(
+                name=_identifier(rpc_match.group(1)),
+                request=_identifier(rpc_match.group(2)),
+                response=_identifier(rpc_match.group(3))
+            ))
 
-    def _parse_enums(self, content: str) -> List[Dict[str, Any]]:
-        """Parse enum definitions"""
-        enums = []
-        enum_pattern = re.compile(r'enum\s+(\w+)\s*\{([^}]*)\}', re.MULTILINE | re.DOTALL)
-        value_pattern = re.compile(r'(\w+)\s*=\s*(\d+)')
-
-        for match in enum_pattern.finditer(content):
-            name = match.group(1)
-            body = match.group(2)
-
-            values = []
-            for value_match in value_pattern.finditer(body):
-                values.append({
-                    "name": value_match.group(1),
-                    "number": int(value_match.group(2))
-                })
+        return ProtoService(name=block.name, rpcs=rpcs)
 
-            enums.append({
-                "name": name,
-                "values": values
-            })
+    def _parse_enum(self, code: bytes, block: _Block) -> Dict[str, Any]:
+        """Parse an enum definition"""
+        values = []
+        match_value = ENUM_VALUE_PATTERN.match
+        for start, end in _statement_spans(code, block):
+            value_match = match_value(code, start, end)
+            if value_match:
+                values.append(ProtoEnumValue(
+                    name=_identifier(value_match.group(1)),
+                    number=int(value_match.group(2))
+                ))
 
-        return enums
+        return {
+            "name": block.name,
+            "values": values
+        }
 
 
 class ProtoAnalyzer:
@@ -194,113 +434,167 @@ class ProtoAnalyzer:
 
     def compare_messages(self, old_msg: ProtoMessage, new_msg: ProtoMessage) -> List[Dict[str, Any]]:
         """Compare two message definitions"""
-        changes = []
+        removed = []
+        modified = []
 
         # Check for field changes
-        old_fields = {f["name"]: f for f in old_msg.fields}
-        new_fields = {f["name"]: f for f in new_msg.fields}
-
-        # Removed fields
-        for name in old_fields:
-            if name not in new_fields:
-                changes.append({
+        old_fields = old_msg.field_index
+        new_fields = new_msg.field_index
+
+        # Removed and modified fields in one pass over the old message
+        for name, old_field in old_fields.items():
+            new_field = new_fields.get(name)
+            if new_field is None:
+                removed.append({
                     "type": "field_removed",
                     "field": name,
                     "message": old_msg.name,
                     "breaking": True
                 })
+                continue
 
-        # Added fields
-        for name in new_fields:
-            if name not in old_fields:
-                field = new_fields[name]
-                changes.append({
-                    "type": "field_added",
+            if old_field.type != new_field.type:
+                modified.append({
+                    "type": "field_type_changed",
                     "field": name,
-                    "message": new_msg.name,
-                    "breaking": field["modifier"] == "required"
+                    "message": old_msg.name,
+                    "old_type": old_field.type,
+                    "new_type": new_field.type,
+                    "breaking": True
                 })
 
-        # Modified fields
-        for name in old_fields:
-            if name in new_fields:
-                old_field = old_fields[name]
-                new_field = new_fields[name]
-
-                if old_field["type"] != new_field["type"]:
-                    changes.append({
-                        "type": "field_type_changed",
-                        "field": name,
-                        "message": old_msg.name,
-                        "old_type": old_field["type"],
-                        "new_type": new_field["type"],
-                        "breaking": True
-                    })
+            if old_field.number != new_field.number:
+                modified.append({
+                    "type": "field_number_changed",
+                    "field": name,
+                    "message": old_msg.name,
+                    "old_number": old_field.number,
+                    "new_number": new_field.number,
+                    "breaking": True
+                })
 
-                if old_field["number"] != new_field["number"]:
-                    changes.append({
-                        "type": "field_number_changed",
-                        "field": name,
-                        "message": old_msg.name,
-                        "old_number": old_field["number"],
-                        "new_number": new_field["number"],
-                        "breaking": True
-                    })
+        # Added fields; every field not removed is shared, so equal counts mean none were added
+        if len(new_fields) == len(old_fields) - len(removed):
+            return removed + modified
 
-        return changes
+        added = [
+            {
+                "type": "field_added",
+                "field": name,
+                "message": new_msg.name,
+                "breaking": new_field.modifier == "required"
+            }
+            for name, new_field in new_fields.items()
+            if name not in old_fields
+        ]
+
+        return removed + added + modified
 
     def compare_services(self, old_svc: ProtoService, new_svc: ProtoService) -> List[Dict[str, Any]]:
         """Compare two service definitions"""
-        changes = []
+        removed = []
+        modified = []
 
-        old_rpcs = {r["name"]: r for r in old_svc.rpcs}
-        new_rpcs = {r["name"]: r for r in new_svc.rpcs}
+        old_rpcs = old_svc.rpc_index
+        new_rpcs = new_svc.rpc_index
 
-        # Removed RPCs
-        for name in old_rpcs:
-            if name not in new_rpcs:
-                changes.append({
+        # Removed and modified RPCs in one pass over the old service
+        for name, old_rpc in old_rpcs.items():
+            new_rpc = new_rpcs.get(name)
+            if new_rpc is None:
+                removed.append({
                     "type": "rpc_removed",
                     "rpc": name,
                     "service": old_svc.name,
                     "breaking": True
                 })
+                continue
 
-        # Added RPCs
-        for name in new_rpcs:
-            if name not in old_rpcs:
-                changes.append({
-                    "type": "rpc_added",
+            if old_rpc.request != new_rpc.request:
+                modified.append({
+                    "type": "rpc_request_changed",
+                    "rpc": name,
+                    "service": old_svc.name,
+                    "old_request": old_rpc.request,
+                    "new_request": new_rpc.request,
+                    "breaking": True
+                })
+
+            if old_rpc.response != new_rpc.response:
+                modified.append({
+                    "type": "rpc_response_changed",
                     "rpc": name,
-                    "service": new_svc.name,
+                    "service": old_svc.name,
+                    "old_response": old_rpc.response,
+                    "new_response": new_rpc.response,
+                    "breaking": True
+                })
+
+        # Added RPCs; every RPC not removed is shared, so equal counts mean none were added
+        if len(new_rpcs) == len(old_rpcs) - len(removed):
+            return removed + modified
+
+        added = [
+            {
+                "type": "rpc_added",
+                "rpc": name,
+                "service": new_svc.name,
+                "breaking": False
+            }
+            for name in new_rpcs
+            if name not in old_rpcs
+        ]
+
+        return removed + added + modified
+
+    def compare_files(self, old_file: ProtoFile, new_file: ProtoFile) -> List[Dict[str, Any]]:
+        """Compare the messages, services and semantics of two proto files"""
+        changes = []
+
+        # Compare messages
+        old_messages = old_file.message_index
+        new_messages = new_file.message_index
+
+        for name, old_msg in old_messages.items():
+            if name in new_messages:
+                changes.extend(
+                    self.compare_messages(old_msg, new_messages[name])
+                )
+            else:
+                changes.append({
+                    "type": "message_removed",
+                    "message": name,
+                    "breaking": True
+                })
+
+        for name in new_messages:
+            if name not in old_messages:
+                changes.append({
+                    "type": "message_added",
+                    "message": name,
                     "breaking": False
                 })
 
-        # Modified RPCs
-        for name in old_rpcs:
-            if name in new_rpcs:
-                old_rpc = old_rpcs[name]
-                new_rpc = new_rpcs[name]
-
-                if old_rpc["request"] != new_rpc["request"]:
-                    changes.append({
-                        "type": "rpc_request_changed",
-                        "rpc": name,
-                        "service": old_svc.name,
-                        "old_request": old_rpc["request"],
-                        "new_request": new_rpc["request"],
-                        "breaking": True
-                    })
+        # Compare services
+        old_services = old_file.service_index
+        new_services = new_file.service_index
 
-                if old_rpc["response"] != new_rpc["response"]:
-                    changes.append({
-                        "type": "rpc_response_changed",
-                        "rpc": name,
-                        "service": old_svc.name,
-                        "old_response": old_rpc["response"],
-                        "new_response": new_rpc["response"],
-                        "breaking": True
-                    })
+        for name, old_svc in old_services.items():
+            if name in new_services:
+                changes.extend(
+                    self.compare_services(old_svc, new_services[name])
+                )
+            else:
+                changes.append({
+                    "type": "service_removed",
+                    "service": name,
+                    "breaking": True
+                })
+
+        # Semantic changes
+        changes.extend(
+            self.analyze_semantic_changes(old_file, new_file)
+        )
 
         return changes
 
@@ -347,11 +641,19 @@ class ProtoAnalyzer:
 class ProtoMCPServer:
     """MCP Server for proto file analysis"""
 
+    EXCLUDE_DIRS = frozenset({"vendor"})
+
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
         self.parser = ProtoParser()
         self.analyzer = ProtoAnalyzer(self.parser)
         self.server = Server("proto-analyzer")
+        # Parsing runs off the event loop on a pool that lives as long as the server.
+        # Threads share the parser's cache, which separate processes could not.
+        self._executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="proto-parse"
+        )
 
         # Register handlers
         self._register_handlers()
@@ -471,7 +773,7 @@ class ProtoMCPServer:
                     }
                     return [types.TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=dump_json(result)
                     )]
                 except Exception as e:
                     return [types.TextContent(
@@ -490,55 +792,14 @@ class ProtoMCPServer:
                     )]
 
                 try:
-                    old_proto = self.parser.parse_file(old_path)
-                    new_proto = self.parser.parse_file(new_path)
-
-                    changes = []
-
-                    # Compare messages
-                    old_messages = {m.name: m for m in old_proto.messages}
-                    new_messages = {m.name: m for m in new_proto.messages}
-
-                    for name, old_msg in old_messages.items():
-                        if name in new_messages:
-                            changes.extend(
-                                self.analyzer.compare_messages(old_msg, new_messages[name])
-                            )
-                        else:
-                            changes.append({
-                                "type": "message_removed",
-                                "message": name,
-                                "breaking": True
-                            })
-
-                    for name in new_messages:
-                        if name not in old_messages:
-                            changes.append({
-                                "type": "message_added",
-                                "message": name,
-                                "breaking": False
-                            })
-
-                    # Compare services
-                    old_services = {s.name: s for s in old_proto.services}
-                    new_services = {s.name: s for s in new_proto.services}
-
-                    for name, old_svc in old_services.items():
-                        if name in new_services:
-                            changes.extend(
-                                self.analyzer.compare_services(old_svc, new_services[name])
-                            )
-                        else:
-                            changes.append({
-                                "type": "service_removed",
-                                "service": name,
-                                "breaking": True
-                            })
-
-                    # Semantic changes
-                    changes.extend(
-                        self.analyzer.analyze_semantic_changes(old_proto, new_proto)
-                    )
+                    # Byte-identical files cannot differ; skip parsing and diffing them
+                    if filecmp.cmp(old_path, new_path, shallow=False):
+                        changes = []
+                    else:
+                        changes = self.analyzer.compare_files(
+                            self.parser.parse_file(old_path),
+                            self.parser.parse_file(new_path)
+                        )
 
                     # Summary
                     breaking_changes = [c for c in changes if c.get("breaking", False)]
@@ -554,7 +815,7 @@ class ProtoMCPServer:
 
                     return [types.TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=dump_json_records(result, "changes")
                     )]
                 except Exception as e:
                     return [types.TextContent(
@@ -574,17 +835,9 @@ class ProtoMCPServer:
                     proto_file = self.parser.parse_file(file_path)
 
                     # Recursively find dependencies
-                    all_deps = set()
-                    to_process = proto_file.imports.copy()
-
-                    while to_process:
-                        dep = to_process.pop(0)
-                        if dep not in all_deps:
-                            all_deps.add(dep)
-                            dep_path = Path(self.workspace_path) / dep
-                            if dep_path.exists():
-                                dep_proto = self.parser.parse_file(dep_path)
-                                to_process.extend(dep_proto.imports)
+                    all_deps = await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self._transitive_imports, proto_file.imports
+                    )
 
                     result = {
                         "file": arguments["file_path"],
@@ -595,7 +848,7 @@ class ProtoMCPServer:
 
                     return [types.TextContent(
                         type="text",
-                        text=json.dumps(result, indent=2)
+                        text=dump_json(result)
                     )]
                 except Exception as e:
                     return [types.TextContent(
@@ -606,57 +859,31 @@ class ProtoMCPServer:
             elif name == "search_definitions":
                 pattern = arguments["pattern"]
                 search_type = arguments.get("type", "all")
+                try:
+                    matcher = re.compile(pattern)
+                except re.error as e:
+                    return [types.TextContent(
+                        type="text",
+                        text=f"Error: Invalid search pattern: {str(e)}"
+                    )]
 
-                results = []
-
-                # Search all proto files
-                for proto_path in self.workspace_path.rglob("*.proto"):
-                    if "vendor" in str(proto_path):
-                        continue
-
-                    try:
-                        proto_file = self.parser.parse_file(proto_path)
-                        file_results = []
-
-                        if search_type in ["message", "all"]:
-                            for msg in proto_file.messages:
-                                if re.search(pattern, msg.name):
-                                    file_results.append({
-                                        "type": "message",
-                                        "name": msg.name,
-                                        "file": str(proto_path.relative_to(self.workspace_path))
-                                    })
-
-                        if search_type in ["service", "all"]:
-                            for svc in proto_file.services:
-                                if re.search(pattern, svc.name):
-                                    file_results.append({
-                                        "type": "service",
-                                        "name": svc.name,
-                                        "file": str(proto_path.relative_to(self.workspace_path))
-                                    })
-
-                        if search_type in ["enum", "all"]:
-                            for enum in proto_file.enums:
-                                if re.search(pattern, enum["name"]):
-                                    file_results.append({
-                                        "type": "enum",
-                                        "name": enum["name"],
-                                        "file": str(proto_path.relative_to(self.workspace_path))
-                                    })
-
-                        results.extend(file_results)
-                    except Exception:
-                        continue
+                # Search all proto files, parsing them on worker threads
+                loop = asyncio.get_running_loop()
+                proto_paths = await loop.run_in_executor(self._executor, self._workspace_protos)
+                file_results = await asyncio.gather(*(
+                    loop.run_in_executor(self._executor, self._search_file, proto_path, matcher, search_type)
+                    for proto_path in proto_paths
+                ))
+                results = [match for matches in file_results for match in matches]
 
                 return [types.TextContent(
                     type="text",
-                    text=json.dumps({
+                    text=dump_json({
                         "pattern": pattern,
                         "type": search_type,
                         "results": results,
                         "count": len(results)
-                    }, indent=2)
+                    })
                 )]
 
             return [types.TextContent(
@@ -664,23 +891,76 @@ class ProtoMCPServer:
                 text=f"Unknown tool: {name}"
             )]
 
+    def _transitive_imports(self, imports: List[str]) -> Set[str]:
+        """Collect every import reachable from the given ones (breadth first)"""
+        all_deps = set()
+        to_process = deque(imports)
+
+        while to_process:
+            dep = to_process.popleft()
+            if dep not in all_deps:
+                all_deps.add(dep)
+                dep_path = Path(self.workspace_path) / dep
+                if dep_path.exists():
+                    # Only the imports of dependencies are needed
+                    dep_imports = self.parser.parse_imports(dep_path)
+                    to_process.extend(d for d in dep_imports if d not in all_deps)
+
+        return all_deps
+
+    def _workspace_protos(self) -> List[Path]:
+        """List the workspace's proto files, skipping vendored ones"""
+        proto_paths = []
+        for root, dirs, files in os.walk(self.workspace_path):
+            # Prune excluded directories so their subtrees are never listed
+            dirs[:] = [d for d in dirs if d not in self.EXCLUDE_DIRS]
+            proto_paths.extend(Path(root, f) for f in files if f.endswith(".proto"))
+        return proto_paths
+
+    def _search_file(self, proto_path: Path, matcher: re.Pattern,
+                     search_type: str) -> List[Dict[str, Any]]:
+        """Find the definitions in one proto file whose names match"""
+        try:
+            proto_file = self.parser.parse_file(proto_path)
+        except Exception:
+            return []
+
+        search = matcher.search
+        matches = []
+        if search_type in ("message", "all"):
+            matches.extend(("message", msg.name) for msg in proto_file.messages if search(msg.name))
+        if search_type in ("service", "all"):
+            matches.extend(("service", svc.name) for svc in proto_file.services if search(svc.name))
+        if search_type in ("enum", "all"):
+            matches.extend(("enum", enum["name"]) for enum in proto_file.enums if search(enum["name"]))
+
+        # Most files have no match; only those pay for building the relative path
+        if not matches:
+            return []
+        relative_path = str(proto_path.relative_to(self.workspace_path))
+        return [
+            {"type": kind, "name": name, "file": relative_path}
+            for kind, name in matches
+        ]
+
     async def run(self):
         """Run the MCP server"""
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="proto-analyzer",
-                    server_version="1.0.0"
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name="proto-analyzer",
+                        server_version="1.0.0"
+                    )
                 )
-            )
+        finally:
+            self._executor.shutdown(wait=False)
 
 
 async def main():
     """Main entry point"""
-    import sys
-
     if not MCP_AVAILABLE:
         print("Error: MCP module is not available.")
         print("This is an optional component. You can skip it or install with:")
@@ -7,18 +7,97 @@ API breaking changes for testing purposes. It can be used locally or in CI/CD pi
 """
 
 import argparse
+import hashlib
+import os
 import re
+import shutil
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property, partial
 from pathlib import Path
-from typing import List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 import json
 import logging
 
+from compat import DATACLASS_SLOTS
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Proto syntax patterns, compiled once at import. Files are edited as raw bytes, and
+# the patterns only ever run at statement offsets found by the scanner.
+FIELD_PATTERN = re.compile(
+    rb'(?!option\b)(?:(?:optional|required|repeated)\s+)?'
+    rb'(?P<type>map\s*<[^>]*>|\.?\w+(?:\s*\.\s*\w+)*)\s+(?P<name>\w+)\s*=\s*(?P<number>\d+)\s*(?P<options>\[)?'
+)
+RPC_PATTERN = re.compile(
+    rb'rpc\s+(?P<name>\w+)\s*\(\s*(?:stream\s+)?(?P<request>\.?\w+(?:\.\w+)*)\s*\)'
+    rb'\s*returns\s*\(\s*(?:stream\s+)?(?P<response>\.?\w+(?:\.\w+)*)\s*\)'
+)
+ENUM_VALUE_PATTERN = re.compile(rb'(?!option\b)(?P<name>\w+)\s*=\s*-?\d+')
+PACKAGE_PATTERN = re.compile(rb'package\s+[\w.]+\s*$')
+WHITESPACE_PATTERN = re.compile(rb'\s*')
+INLINE_SPACE_PATTERN = re.compile(rb'[ \t\r]*')
+
+# The two patterns that run over the whole file use re2's linear-time engine when
+# it is installed; both are written in the syntax common to re and re2
+_scanner_re = re2 if RE2_AVAILABLE else re
+# Comments (blanked before scanning) and the string literals that may contain comment markers
+COMMENT_PATTERN = _scanner_re.compile(
+    rb'(?s)("(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')|//[^\n]*|/\*.*?(?:\*/|$)'
+)
+NON_NEWLINE_PATTERN = re.compile(rb'[^\n]')
+# Tokens that delimit blocks and statements; string literals are matched so their contents are skipped
+STRUCTURE_PATTERN = _scanner_re.compile(rb'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|[{};]')
+# Tokens that nest inside field options, plus the commas separating top-level entries
+OPTION_TOKEN_PATTERN = re.compile(
+    rb'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|//[^\n]*|/\*.*?\*/|[\[{(,)}\]]', re.DOTALL
+)
+# Byte classes recorded by _classify; comment lines above a statement are removed with it
+CODE, LINE_COMMENT, BLOCK_COMMENT, STRING = b"\x00", b"\x01", b"\x02", b"\x03"
+COMMENT_CLASSES = LINE_COMMENT + BLOCK_COMMENT
+BLOCK_KEYWORDS = frozenset({b"message", b"enum", b"service", b"oneof", b"extend"})
+
+# Definitions inserted by the mutators, each filled in with one bytes %-formatting pass
+REQUIRED_FIELD_TEMPLATE = (
+    b'\n  // Added for testing backward compatibility\n'
+    b'  %s %s = %s [\n'
+    b'    (google.api.field_behavior) = REQUIRED,\n'
+    b'    %s\n'
+    b'  ];\n'
+)
+# Validation added along with a required field: length bounds for strings, presence otherwise
+STRING_VALIDATION = b'(buf.validate.field).string = {\n      min_len: 1\n      max_len: 200\n    }'
+REQUIRED_VALIDATION = b'(buf.validate.field).required = true'
+ENUM_VALUE_TEMPLATE = b'\n  // Added for testing\n  %s = %s;\n'
+RPC_TEMPLATE = (
+    b'\n  // Added for testing\n'
+    b'  rpc %s(%s) returns (%s) {\n'
+    b'    option (google.api.http) = {\n'
+    b'      post: "/v1/test/%s"\n'
+    b'      body: "*"\n'
+    b'    };\n'
+    b'  };\n'
+)
 
 class ChangeType(Enum):
     """Types of proto modifications that can be applied"""
@@ -40,121 +119,558 @@ class ChangeType(Enum):
     CHANGE_VALIDATION = "change_validation"
 
 
+@dataclass(**DATACLASS_SLOTS)
+class FieldNode:
+    """A message field, with the offsets of the tokens mutators rewrite"""
+    name: str
+    start: int
+    end: int
+    type_span: Tuple[int, int]
+    name_span: Tuple[int, int]
+    number_span: Tuple[int, int]
+    options_span: Optional[Tuple[int, int]] = None
+
+
+@dataclass(**DATACLASS_SLOTS)
+class EnumValueNode:
+    """An enum value statement"""
+    name: str
+    start: int
+    end: int
+
+
+@dataclass(**DATACLASS_SLOTS)
+class RpcNode:
+    """An RPC statement, with the offsets of its request and response types"""
+    name: str
+    start: int
+    end: int
+    request_span: Tuple[int, int]
+    response_span: Tuple[int, int]
+
+
+StatementNode = Union[FieldNode, EnumValueNode, RpcNode]
+
+
+@dataclass
+class BlockNode:
+    """A message, enum, service or oneof block; body_end is the offset of its closing brace"""
+    kind: str
+    name: str
+    start: int
+    body_start: int
+    body_end: int = -1
+    members: Dict[str, StatementNode] = field(default_factory=dict)
+
+
+def _identifier(raw: bytes) -> str:
+    """Decode an identifier and intern it, so repeated names share one object and compare by identity"""
+    return sys.intern(raw.decode())
+
+
+def _blank_comment(match: re.Match) -> bytes:
+    """Replace a comment with spaces (keeping newlines) but leave string literals intact"""
+    text = match.group(0)
+    if match.group(1) is not None:
+        return text
+    # Line comments (the common case) never span a newline, so no substitution is needed
+    if b"\n" not in text:
+        return b" " * len(text)
+    return NON_NEWLINE_PATTERN.sub(b" ", text)
+
+
+def _strip_comments(content: bytes) -> bytes:
+    """Blank out the comments of proto source, keeping offsets and string literals intact"""
+    if b"//" in content or b"/*" in content:
+        return COMMENT_PATTERN.sub(_blank_comment, content)
+    return content
+
+
+def _classify(content: bytes) -> bytes:
+    """Classify each byte of proto source as code, line comment, block comment or string"""
+    mask = bytearray(len(content))
+    for match in COMMENT_PATTERN.finditer(content):
+        start, end = match.span()
+        if match.group(1) is not None:
+            kind = STRING
+        elif content.startswith(b"//", start):
+            kind = LINE_COMMENT
+        else:
+            kind = BLOCK_COMMENT
+        mask[start:end] = kind * (end - start)
+    return bytes(mask)
+
+
+def _split_options(text: bytes) -> List[bytes]:
+    """Split the inside of a field's [...] options into its top-level entries"""
+    entries = []
+    depth = 0
+    start = 0
+    for match in OPTION_TOKEN_PATTERN.finditer(text):
+        token = match.group(0)
+        if token in b"[{(":
+            depth += 1
+        elif token in b")}]":
+            depth -= 1
+        elif token == b"," and depth == 0:
+            entries.append(text[start:match.start()].strip())
+            start = match.end()
+    entries.append(text[start:].strip())
+    return [entry for entry in entries if entry]
+
+
+def _render_options(entries: List[bytes]) -> bytes:
+    """Format field options one entry per line, matching the layout of the proto sources"""
+    return b"[\n    " + b",\n    ".join(entries) + b"\n  ]"
+
+
+@dataclass
+class ProtoAST:
+    """Offsets of the definitions in a proto file, located in a single scan
+
+    Messages, enums and services are indexed by name (nested definitions
+    included, first definition wins) and nested definitions also by their
+    qualified name such as "Outer.Inner", so mutators look up the exact
+    span they rewrite instead of re-matching the whole file. Trees are shared
+    through the parse cache, so nothing modifies one after parse().
+    """
+    package: Optional[Tuple[int, int]] = None
+    messages: Dict[str, BlockNode] = field(default_factory=dict)
+    enums: Dict[str, BlockNode] = field(default_factory=dict)
+    services: Dict[str, BlockNode] = field(default_factory=dict)
+    # Per-byte classes from _classify, left empty when the source has no comments
+    mask: bytes = b""
+
+    @classmethod
+    def parse(cls, content: bytes) -> 'ProtoAST':
+        """Scan proto source once, tracking brace depth and recording statement offsets"""
+        # Scan an immutable copy, so tokens are bytes even when given the edit buffer
+        code = bytes(_strip_comments(content))
+        ast = cls()
+        if code != content:
+            ast.mask = _classify(content)
+        root = BlockNode(kind="", name="", start=0, body_start=0, body_end=len(code))
+        stack = [root]
+        # Depth inside an aggregate option value such as `(google.api.http) = {...}`
+        literal_depth = 0
+        statement_start = 0
+        skip_whitespace = WHITESPACE_PATTERN.match
+        add_statement = ast._add_statement
+
+        for match in STRUCTURE_PATTERN.finditer(code):
+            token = match.group(0)
+            if token not in b"{};":
+                # String literal
+                continue
+            if literal_depth:
+                if token == b"{":
+                    literal_depth += 1
+                elif token == b"}":
+                    literal_depth -= 1
+                continue
+
+            if token == b"{":
+                start = skip_whitespace(code, statement_start).end()
+                words = code[start:match.start()].split()
+                parent = stack[-1]
+                if len(words) == 2 and words[0] in BLOCK_KEYWORDS:
+                    kind, name = _identifier(words[0]), _identifier(words[1])
+                    block = BlockNode(kind=kind, name=name, start=start, body_start=match.end())
+                    if kind == "oneof":
+                        # Oneof fields belong to the enclosing message
+                        block.members = parent.members
+                    elif kind != "extend":
+                        table = getattr(ast, kind + "s")
+                        table.setdefault(name, block)
+                        if parent.kind == "message":
+                            scope = ".".join(b.name for b in stack if b.kind == "message")
+                            table.setdefault(f"{scope}.{name}", block)
+                    stack.append(block)
+                elif parent.kind == "service" and ast._add_rpc(parent, code, start, match.start(), -1):
+                    # The RPC body only holds options; the RPC ends where the body closes
+                    stack.append(BlockNode(kind="rpc", name="", start=start, body_start=match.end()))
+                else:
+                    literal_depth = 1
+                    continue
+            elif token == b"}":
+                if len(stack) > 1:
+                    block = stack.pop()
+                    block.body_end = match.start()
+                    if block.kind == "rpc":
+                        for rpc in stack[-1].members.values():
+                            if rpc.start == block.start:
+                                rpc.end = match.end()
+                                break
+            else:
+                add_statement(stack[-1], code, statement_start, match.start(), match.end())
+            statement_start = match.end()
+
+        return ast
+
+    def _add_statement(self, block: BlockNode, code: bytes, start: int, pos: int, end: int):
+        """Record the statement between start and its ";" at pos in the block it belongs to"""
+        start = WHITESPACE_PATTERN.match(code, start, pos).end()
+        if block.kind in ("message", "oneof"):
+            match = FIELD_PATTERN.match(code, start, pos)
+            if match:
+                options_span = None
+                if match.group("options"):
+                    options_span = (match.start("options"), code.rfind(b"]", start, pos) + 1)
+                name = _identifier(match.group("name"))
+                block.members.setdefault(name, FieldNode(
+                    name=name,
+                    start=start,
+                    end=end,
+                    type_span=match.span("type"),
+                    name_span=match.span("name"),
+                    number_span=match.span("number"),
+                    options_span=options_span
+                ))
+        elif block.kind == "enum":
+            match = ENUM_VALUE_PATTERN.match(code, start, pos)
+            if match:
+                name = _identifier(match.group("name"))
+                block.members.setdefault(name, EnumValueNode(
+                    name=name, start=start, end=end
+                ))
+        elif block.kind == "service":
+            self._add_rpc(block, code, start, pos, end)
+        elif not block.kind and self.package is None and PACKAGE_PATTERN.match(code, start, pos):
+            self.package = (start, end)
+
+    @staticmethod
+    def _add_rpc(block: BlockNode, code: bytes, start: int, pos: int, end: int) -> bool:
+        """Record an RPC declared between start and pos, returning whether it was one"""
+        match = RPC_PATTERN.match(code, start, pos)
+        if not match:
+            return False
+        name = _identifier(match.group("name"))
+        block.members.setdefault(name, RpcNode(
+            name=name,
+            start=start,
+            end=end,
+            request_span=match.span("request"),
+            response_span=match.span("response")
+        ))
+        return True
+
+
+# Parsed definitions of recently seen contents, keyed by their blake2b digest. Every
+# scenario starts from the same file, so all but the first one reuse its parse.
+_PARSE_CACHE: "OrderedDict[bytes, ProtoAST]" = OrderedDict()
+_PARSE_CACHE_SIZE = 32
+
+
+def _parse_cached(content: bytes) -> ProtoAST:
+    """Parse proto source, reusing the result for content parsed recently"""
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    ast = _PARSE_CACHE.get(digest)
+    if ast is None:
+        ast = _PARSE_CACHE[digest] = ProtoAST.parse(content)
+        if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    else:
+        _PARSE_CACHE.move_to_end(digest)
+    return ast
+
+
 class ProtoModifier:
     """Handles modifications to protobuf files"""
 
-    def __init__(self, proto_file: Path):
+    def __init__(self, proto_file: Path, original_bytes: Optional[bytes] = None):
         self.proto_file = proto_file
-        self.original_content = proto_file.read_text()
-        self.modified_content = self.original_content
         self.changes_made = []
+        if original_bytes is not None:
+            # Callers holding a snapshot of the file spare every modifier a read
+            self.__dict__["original_content"] = original_bytes
+        # Whether the original content is known to be what is on disk, so save() can link it
+        self._original_on_disk = original_bytes is None
+        self._ast: Optional[ProtoAST] = None
+        # (start, end, sequence, text) edits collected while a batch() is open
+        self._pending_edits: Optional[List[Tuple[int, int, int, bytes]]] = None
+        # Whether save() has written to the proto file, so restore() has something to undo
+        self._saved = False
+
+    @cached_property
+    def original_content(self) -> bytes:
+        """Raw bytes of the proto file, read on first use so restore() never has to"""
+        return self.proto_file.read_bytes()
+
+    @cached_property
+    def modified_content(self) -> bytearray:
+        """Edit buffer; edits are spliced into it in place instead of rebuilding the whole file
+
+        It is only copied from the original bytes when first edited; lookups before that
+        scan the original directly.
+        """
+        return bytearray(self.original_content)
+
+    @property
+    def _content(self) -> Union[bytes, bytearray]:
+        """Current content: the original bytes until the first edit materializes the buffer"""
+        return self.__dict__.get("modified_content", self.original_content)
+
+    @property
+    def ast(self) -> ProtoAST:
+        """Definition offsets of the modified content, rescanned only after an edit"""
+        if self._ast is None:
+            self._ast = _parse_cached(self._content)
+        return self._ast
+
+    def _splice(self, start: int, end: int, text: bytes):
+        """Replace modified_content[start:end] with text in place, or queue it inside a batch"""
+        if self._pending_edits is not None:
+            self._pending_edits.append((start, end, len(self._pending_edits), text))
+            return
+        self.modified_content[start:end] = text
+        self._ast = None
+
+    @contextmanager
+    def batch(self) -> Iterator['ProtoModifier']:
+        """Apply every mutation made inside the block against a single scan of the content
+
+        Lookups see the content as it was when the batch opened, and the queued edits are
+        spliced on exit in descending offset order so none shifts the span of another.
+        Overlapping edits raise ValueError and leave the content untouched.
+        """
+        if self._pending_edits is not None:
+            # Already batching; the outermost batch applies the edits
+            yield self
+            return
+
+        self._pending_edits = edits = []
+        changes = len(self.changes_made)
+        try:
+            yield self
+            # Insertions at the same offset end up in the order they were made
+            edits.sort(reverse=True)
+            for (_, end, _, _), (start, _, _, _) in zip(edits[1:], edits):
+                if end > start:
+                    raise ValueError(f"Conflicting edits to {self.proto_file} at offset {start}")
+            for start, end, _, text in edits:
+                self.modified_content[start:end] = text
+        except Exception:
+            del self.changes_made[changes:]
+            raise
+        finally:
+            self._pending_edits = None
+        if edits:
+            self._ast = None
+
+    def _lookup(self, kind: str, name: str, member: Optional[str] = None):
+        """Find a message/enum/service block, or one of its members, warning when it is missing"""
+        block = getattr(self.ast, kind + "s").get(name)
+        if block is None:
+            logger.warning("%s %s not found in %s", kind.capitalize(), name, self.proto_file)
+            return None
+        if member is None:
+            return block
+        node = block.members.get(member)
+        if node is None:
+            logger.warning("%s not found in %s %s", member, kind, name)
+        return node
+
+    def _associated_comments(self, start: int) -> Tuple[int, int]:
+        """Find the run of whole comment lines directly above the line starting at `start`"""
+        content, mask = self._content, self.ast.mask
+        comment_start = start
+        while comment_start and mask:
+            previous = content.rfind(b"\n", 0, comment_start - 1) + 1
+            line = content[previous:comment_start]
+            text = line.strip()
+            offset = previous + len(line) - len(line.lstrip())
+            # Stop at blank lines and at lines holding any code or string bytes
+            if not text or mask[offset:offset + len(text)].translate(None, COMMENT_CLASSES):
+                break
+            comment_start = previous
+
+        # Don't begin partway through a block comment opened after code on an earlier line
+        while comment_start < start:
+            offset = WHITESPACE_PATTERN.match(content, comment_start).end()
+            if mask[offset:offset + 1] != BLOCK_COMMENT or content.startswith(b"/*", offset):
+                break
+            comment_start = content.find(b"\n", offset) + 1
+        return comment_start, start
+
+    def _only_comments(self, start: int, end: int) -> bool:
+        """Whether content[start:end] holds nothing but comments and spaces"""
+        mask = self.ast.mask
+        return bool(mask) and all(
+            kind in COMMENT_CLASSES or byte in b" \t\r"
+            for byte, kind in zip(self._content[start:end], mask[start:end])
+        )
+
+    def _removal_span(self, node: StatementNode) -> Tuple[int, int]:
+        """Extend a statement's span over its leading and trailing comments and the rest of its line"""
+        content, mask = self._content, self.ast.mask
+        line_start = content.rfind(b"\n", 0, node.start) + 1
+        start = node.start
+        if not content[line_start:node.start].strip() or self._only_comments(line_start, node.start):
+            # The statement starts its line, or follows only comments such as `/* doc */`
+            start = self._associated_comments(line_start)[0]
+            offset = WHITESPACE_PATTERN.match(content, start).end()
+            if mask[offset:offset + 1] == BLOCK_COMMENT and not content.startswith(b"/*", offset):
+                # The comment began after code on an earlier line, so only the statement goes
+                start = node.start
+
+        end = node.end
+        if content.startswith(b";", end):
+            # Trailing ";" after an RPC body
+            end += 1
+        # Take trailing comments along, including a block comment running onto later lines
+        position = INLINE_SPACE_PATTERN.match(content, end).end()
+        while mask[position:position + 1] in (LINE_COMMENT, BLOCK_COMMENT) and \
+                content.startswith((b"//", b"/*"), position):
+            position = COMMENT_PATTERN.match(content, position).end()
+            position = INLINE_SPACE_PATTERN.match(content, position).end()
+        if position == len(content) or content.startswith(b"\n", position):
+            if not content[content.rfind(b"\n", 0, start) + 1:start].strip():
+                end = min(position + 1, len(content))
+            else:
+                # Code stays before it on the line, so keep the newline and drop the gap instead
+                end = position
+                while content[start - 1:start] in (b" ", b"\t"):
+                    start -= 1
+        # Drop one of the blank lines that would otherwise be left on both sides
+        if content.startswith(b"\n", end) and content.endswith(b"\n\n", 0, start):
+            end += 1
+        return start, end
+
+    def _package_span(self) -> Optional[Tuple[int, int]]:
+        """Locate the package statement, scanning only the file header when nothing is parsed yet"""
+        if self._ast is not None:
+            return self._ast.package
+
+        # The first "package ...;" is almost always the statement itself; it counts only if it
+        # is still intact once comments in the header are blanked, otherwise fall back to a scan
+        content = self._content
+        start = content.find(b"package")
+        end = content.find(b";", start)
+        if start != -1 and end != -1:
+            header = _strip_comments(bytes(content[:end + 1]))
+            if (header.endswith(b";") and header[start - 1:start] in (b"", b" ", b"\t", b"\n", b";")
+                    and PACKAGE_PATTERN.match(header, start, end)):
+                return start, end + 1
+        return self.ast.package
+
+    def _option_entries(self, node: FieldNode) -> List[bytes]:
+        """Return the top-level entries of a field's [...] options"""
+        if node.options_span is None:
+            return []
+        start, end = node.options_span
+        return _split_options(self._content[start + 1:end - 1])
+
+    def _set_options(self, node: FieldNode, entries: List[bytes]):
+        """Rewrite a field's options, dropping the brackets when no entries are left"""
+        if node.options_span is not None:
+            start, end = node.options_span
+            if not entries:
+                # Also drop the whitespace between the field number and "["
+                start = node.number_span[1]
+            self._splice(start, end, _render_options(entries) if entries else b"")
+        elif entries:
+            self._splice(node.number_span[1], node.number_span[1], b" " + _render_options(entries))
 
     def reset(self):
         """Reset to original content"""
-        self.modified_content = self.original_content
+        # The buffer is re-seeded from the original bytes on next use
+        self.__dict__.pop("modified_content", None)
         self.changes_made = []
+        self._ast = None
 
     def save(self, backup: bool = True) -> Path:
-        """Save modified content to file"""
+        """Save modified content to file, skipping all I/O when nothing changed"""
+        # Until the first edit the content is the original object, so this is an identity check
+        if self._content == self.original_content:
+            logger.info("No modifications to save to %s", self.proto_file)
+            return self.proto_file
+
         if backup:
             backup_path = self.proto_file.with_suffix('.proto.bak')
-            backup_path.write_text(self.original_content)
-            logger.info(f"Created backup at {backup_path}")
-
-        self.proto_file.write_text(self.modified_content)
-        logger.info(f"Saved modifications to {self.proto_file}")
+            if not (self._original_on_disk and not self._saved and self._link_backup(backup_path)):
+                backup_path.write_bytes(self.original_content)
+            logger.info("Created backup at %s", backup_path)
+
+        # Write a new file and rename it over the proto, so a hard-linked backup keeps the
+        # original inode intact and readers never see a partially written file
+        staging_path = self.proto_file.with_name(self.proto_file.name + '.tmp')
+        staging_path.write_bytes(self._content)
+        shutil.copymode(self.proto_file, staging_path)
+        os.replace(staging_path, self.proto_file)
+        self._saved = True
+        logger.info("Saved modifications to %s", self.proto_file)
         return self.proto_file
 
+    def _link_backup(self, backup_path: Path) -> bool:
+        """Hard-link the unmodified proto file as its backup, copying no bytes"""
+        try:
+            if backup_path.exists():
+                backup_path.unlink()
+            os.link(self.proto_file, backup_path)
+            return True
+        except OSError:
+            # No hard links on this filesystem; the caller writes a copy instead
+            return False
+
     def restore(self):
         """Restore from backup if exists"""
         backup_path = self.proto_file.with_suffix('.proto.bak')
         if backup_path.exists():
-            self.proto_file.write_text(backup_path.read_text())
-            backup_path.unlink()
-            logger.info(f"Restored {self.proto_file} from backup")
+            # Renaming the backup over the file restores it without copying any bytes
+            os.replace(backup_path, self.proto_file)
+            logger.info("Restored %s from backup", self.proto_file)
+        elif self._saved:
+            self.proto_file.write_bytes(self.original_content)
+            logger.info("Restored %s to original content", self.proto_file)
         else:
-            self.proto_file.write_text(self.original_content)
-            logger.info(f"Restored {self.proto_file} to original content")
+            logger.info("%s was never modified, nothing to restore", self.proto_file)
 
     def add_required_field(self, message_name: str, field_name: str,
                           field_type: str = "string", field_num: int = 99):
         """Add a new required field to a message"""
-        # Find the message and add field after the last existing field
-        pattern = rf'(message\s+{message_name}\s*{{[^}}]*)(}})'
+        message = self._lookup("message", message_name)
+        if message is None:
+            return
 
         # Create the new field with proper validation syntax for strings
-        new_field = f'\n  // Added for testing backward compatibility\n'
-        new_field += f'  {field_type} {field_name} = {field_num} [\n'
-        new_field += f'    (google.api.field_behavior) = REQUIRED'
-
-        # Add string validation if field type is string
-        if field_type == "string":
-            new_field += f',\n    (buf.validate.field).string = {{\n'
-            new_field += f'      min_len: 1\n'
-            new_field += f'      max_len: 200\n'
-            new_field += f'    }}'
-        else:
-            new_field += f',\n    (buf.validate.field).required = true'
-
-        new_field += f'\n  ];\n'
-
-        def replacer(match):
-            content = match.group(1)
-            # Find the last field by looking for the last semicolon before the closing brace
-            # This ensures we add the new field after all existing fields
-            last_field_end = content.rfind(';')
-            if last_field_end != -1:
-                # Insert after the last field
-                return content[:last_field_end+1] + new_field + content[last_field_end+1:] + match.group(2)
-            else:
-                # No fields found, add at the beginning of the message body
-                return match.group(1) + new_field + match.group(2)
+        new_field = REQUIRED_FIELD_TEMPLATE % (
+            field_type.encode(), field_name.encode(), str(field_num).encode(),
+            STRING_VALIDATION if field_type == "string" else REQUIRED_VALIDATION
+        )
 
-        self.modified_content = re.sub(pattern, replacer, self.modified_content, flags=re.DOTALL)
+        # Append after everything already in the message, just before its closing brace
+        self._splice(message.body_end, message.body_end, new_field)
         self.changes_made.append({
             "type": ChangeType.ADD_REQUIRED_FIELD.value,
             "message": message_name,
             "field": field_name,
             "details": f"Added required field '{field_name}' of type '{field_type}'"
         })
-        logger.info(f"Added required field {field_name} to message {message_name}")
+        logger.debug("Added required field %s to message %s", field_name, message_name)
 
     def remove_field(self, message_name: str, field_name: str):
         """Remove a field from a message"""
-        # Pattern to match field definition (handles multi-line fields)
-        pattern = rf'(\s*//[^\n]*\n)?(\s*{field_type}\s+{field_name}\s*=\s*\d+[^;]*;)'
-
-        # First, find the field to get its type
-        message_pattern = rf'message\s+{message_name}\s*{{([^}}]*)}}'
-        message_match = re.search(message_pattern, self.modified_content)
-
-        if message_match:
-            message_body = message_match.group(1)
-            # More flexible pattern to match any field type
-            field_pattern = rf'\s*(\w+(?:\s*\.\s*\w+)*)\s+{field_name}\s*=\s*\d+'
-            field_match = re.search(field_pattern, message_body)
-
-            if field_match:
-                # Remove the field and its comments
-                remove_pattern = rf'(\s*//[^\n]*\n)*\s*\w+(?:\s*\.\s*\w+)*\s+{field_name}\s*=\s*\d+[^;]*;\n?'
-                self.modified_content = re.sub(remove_pattern, '', self.modified_content)
-
-                self.changes_made.append({
-                    "type": ChangeType.REMOVE_FIELD.value,
-                    "message": message_name,
-                    "field": field_name,
-                    "details": f"Removed field '{field_name}' from message '{message_name}'"
-                })
-                logger.info(f"Removed field {field_name} from message {message_name}")
+        field_node = self._lookup("message", message_name, field_name)
+        if field_node is None:
+            return
+
+        # Remove the field and its comments
+        self._splice(*self._removal_span(field_node), b"")
+        self.changes_made.append({
+            "type": ChangeType.REMOVE_FIELD.value,
+            "message": message_name,
+            "field": field_name,
+            "details": f"Removed field '{field_name}' from message '{message_name}'"
+        })
+        logger.debug("Removed field %s from message %s", field_name, message_name)
 
     def change_field_type(self, message_name: str, field_name: str, new_type: str):
         """Change the type of a field"""
-        pattern = rf'(message\s+{message_name}\s*{{[^}}]*?)(\w+(?:\s*\.\s*\w+)*)\s+({field_name}\s*=\s*\d+[^;]*;)'
-
-        def replacer(match):
-            return match.group(1) + new_type + ' ' + match.group(3)
+        field_node = self._lookup("message", message_name, field_name)
+        if field_node is None:
+            return
 
-        self.modified_content = re.sub(pattern, replacer, self.modified_content)
+        self._splice(*field_node.type_span, new_type.encode())
         self.changes_made.append({
             "type": ChangeType.CHANGE_FIELD_TYPE.value,
             "message": message_name,
@@ -162,16 +678,16 @@ class ProtoModifier:
             "new_type": new_type,
             "details": f"Changed type of field '{field_name}' to '{new_type}'"
         })
-        logger.info(f"Changed field {field_name} type to {new_type} in message {message_name}")
+        logger.debug("Changed field %s type to %s in message %s",
+                     field_name, new_type, message_name)
 
     def change_field_number(self, message_name: str, field_name: str, new_number: int):
         """Change the field number of a field"""
-        pattern = rf'(message\s+{message_name}\s*{{[^}}]*?\w+\s+{field_name}\s*=\s*)(\d+)'
+        field_node = self._lookup("message", message_name, field_name)
+        if field_node is None:
+            return
 
-        def replacer(match):
-            return match.group(1) + str(new_number)
-
-        self.modified_content = re.sub(pattern, replacer, self.modified_content)
+        self._splice(*field_node.number_span, b"%d" % new_number)
         self.changes_made.append({
             "type": ChangeType.CHANGE_FIELD_NUMBER.value,
             "message": message_name,
@@ -179,16 +695,16 @@ class ProtoModifier:
             "new_number": new_number,
             "details": f"Changed field number of '{field_name}' to {new_number}"
         })
-        logger.info(f"Changed field {field_name} number to {new_number} in message {message_name}")
+        logger.debug("Changed field %s number to %s in message %s",
+                     field_name, new_number, message_name)
 
     def rename_field(self, message_name: str, old_name: str, new_name: str):
         """Rename a field in a message"""
-        pattern = rf'(message\s+{message_name}\s*{{[^}}]*?\w+\s+){old_name}(\s*=\s*\d+)'
-
-        def replacer(match):
-            return match.group(1) + new_name + match.group(2)
+        field_node = self._lookup("message", message_name, old_name)
+        if field_node is None:
+            return
 
-        self.modified_content = re.sub(pattern, replacer, self.modified_content)
+        self._splice(*field_node.name_span, new_name.encode())
         self.changes_made.append({
             "type": ChangeType.RENAME_FIELD.value,
             "message": message_name,
@@ -196,18 +712,17 @@ class ProtoModifier:
             "new_name": new_name,
             "details": f"Renamed field '{old_name}' to '{new_name}'"
         })
-        logger.info(f"Renamed field {old_name} to {new_name} in message {message_name}")
+        logger.debug("Renamed field %s to %s in message %s", old_name, new_name, message_name)
 
     def add_enum_value(self, enum_name: str, value_name: str, value_num: int = 99):
         """Add a new value to an enum"""
-        pattern = rf'(enum\s+{enum_name}\s*{{[^}}]*)(}})'
+        enum = self._lookup("enum", enum_name)
+        if enum is None:
+            return
 
-        new_value = f'\n  // Added for testing\n  {value_name} = {value_num};\n'
+        new_value = ENUM_VALUE_TEMPLATE % (value_name.encode(), str(value_num).encode())
 
-        def replacer(match):
-            return match.group(1) + new_value + match.group(2)
-
-        self.modified_content = re.sub(pattern, replacer, self.modified_content)
+        self._splice(enum.body_end, enum.body_end, new_value)
         self.changes_made.append({
             "type": ChangeType.ADD_ENUM_VALUE.value,
             "enum": enum_name,
@@ -215,39 +730,35 @@ class ProtoModifier:
             "number": value_num,
             "details": f"Added enum value '{value_name}' = {value_num}"
         })
-        logger.info(f"Added enum value {value_name} to enum {enum_name}")
+        logger.debug("Added enum value %s to enum %s", value_name, enum_name)
 
     def remove_enum_value(self, enum_name: str, value_name: str):
         """Remove a value from an enum"""
-        pattern = rf'(\s*//[^\n]*\n)*\s*{value_name}\s*=\s*\d+;\n?'
-
-        # Only remove within the specific enum
-        enum_pattern = rf'(enum\s+{enum_name}\s*{{)([^}}]*)(}})'
+        value = self._lookup("enum", enum_name, value_name)
+        if value is None:
+            return
 
-        def replacer(match):
-            enum_body = re.sub(pattern, '', match.group(2))
-            return match.group(1) + enum_body + match.group(3)
-
-        self.modified_content = re.sub(enum_pattern, replacer, self.modified_content)
+        self._splice(*self._removal_span(value), b"")
         self.changes_made.append({
             "type": ChangeType.REMOVE_ENUM_VALUE.value,
             "enum": enum_name,
             "value": value_name,
             "details": f"Removed enum value '{value_name}'"
         })
-        logger.info(f"Removed enum value {value_name} from enum {enum_name}")
+        logger.debug("Removed enum value %s from enum %s", value_name, enum_name)
 
     def change_rpc(self, service_name: str, rpc_name: str,
                    new_request: Optional[str] = None, new_response: Optional[str] = None):
         """Change RPC request or response type"""
-        pattern = rf'(service\s+{service_name}\s*{{[^}}]*rpc\s+{rpc_name}\s*\()([^)]+)\)\s*returns\s*\(([^)]+)\)'
-
-        def replacer(match):
-            req = new_request if new_request else match.group(2)
-            resp = new_response if new_response else match.group(3)
-            return match.group(1) + req + ') returns (' + resp + ')'
-
-        self.modified_content = re.sub(pattern, replacer, self.modified_content)
+        rpc = self._lookup("service", service_name, rpc_name)
+        if rpc is None:
+            return
+
+        # The response comes after the request, so splicing it first keeps the request span valid
+        if new_response:
+            self._splice(*rpc.response_span, new_response.encode())
+        if new_request:
+            self._splice(*rpc.request_span, new_request.encode())
         self.changes_made.append({
             "type": ChangeType.CHANGE_RPC.value,
             "service": service_name,
@@ -256,25 +767,20 @@ class ProtoModifier:
             "new_response": new_response,
             "details": f"Changed RPC '{rpc_name}' signature"
         })
-        logger.info(f"Changed RPC {rpc_name} in service {service_name}")
+        logger.debug("Changed RPC %s in service %s", rpc_name, service_name)
 
     def add_rpc(self, service_name: str, rpc_name: str,
                 request_type: str, response_type: str):
         """Add a new RPC to a service"""
-        pattern = rf'(service\s+{service_name}\s*{{[^}}]*)(}})'
-
-        new_rpc = f'\n  // Added for testing\n'
-        new_rpc += f'  rpc {rpc_name}({request_type}) returns ({response_type}) {{\n'
-        new_rpc += f'    option (google.api.http) = {{\n'
-        new_rpc += f'      post: "/v1/test/{rpc_name.lower()}"\n'
-        new_rpc += f'      body: "*"\n'
-        new_rpc += f'    }};\n'
-        new_rpc += f'  }};\n'
+        service = self._lookup("service", service_name)
+        if service is None:
+            return
 
-        def replacer(match):
-            return match.group(1) + new_rpc + match.group(2)
+        new_rpc = RPC_TEMPLATE % (
+            rpc_name.encode(), request_type.encode(), response_type.encode(), rpc_name.lower().encode()
+        )
 
-        self.modified_content = re.sub(pattern, replacer, self.modified_content)
+        self._splice(service.body_end, service.body_end, new_rpc)
         self.changes_made.append({
             "type": ChangeType.ADD_RPC.value,
             "service": service_name,
@@ -283,135 +789,94 @@ class ProtoModifier:
             "response": response_type,
             "details": f"Added RPC '{rpc_name}'"
         })
-        logger.info(f"Added RPC {rpc_name} to service {service_name}")
+        logger.debug("Added RPC %s to service %s", rpc_name, service_name)
 
     def remove_rpc(self, service_name: str, rpc_name: str):
         """Remove an RPC from a service"""
-        # Pattern to match RPC definition with optional HTTP options
-        pattern = rf'\s*//[^\n]*\n\s*rpc\s+{rpc_name}\s*\([^)]+\)\s*returns\s*\([^)]+\)\s*{{[^}}]*}};\n?'
-
-        # Only remove within the specific service
-        service_pattern = rf'(service\s+{service_name}\s*{{)([^}}]*)(}})'
-
-        def replacer(match):
-            service_body = re.sub(pattern, '', match.group(2))
-            return match.group(1) + service_body + match.group(3)
+        rpc = self._lookup("service", service_name, rpc_name)
+        if rpc is None:
+            return
 
-        self.modified_content = re.sub(service_pattern, replacer, self.modified_content, flags=re.DOTALL)
+        # Remove the RPC with its HTTP options and comments
+        self._splice(*self._removal_span(rpc), b"")
         self.changes_made.append({
             "type": ChangeType.REMOVE_RPC.value,
             "service": service_name,
             "rpc": rpc_name,
             "details": f"Removed RPC '{rpc_name}'"
         })
-        logger.info(f"Removed RPC {rpc_name} from service {service_name}")
+        logger.debug("Removed RPC %s from service %s", rpc_name, service_name)
 
     def change_package(self, new_package: str):
         """Change the package name"""
-        pattern = r'package\s+[^;]+;'
-        replacement = f'package {new_package};'
+        package = self._package_span()
+        if package is None:
+            logger.warning("No package statement in %s", self.proto_file)
+            return
 
-        self.modified_content = re.sub(pattern, replacement, self.modified_content)
+        self._splice(*package, f'package {new_package};'.encode())
         self.changes_made.append({
             "type": ChangeType.CHANGE_PACKAGE.value,
             "new_package": new_package,
             "details": f"Changed package to '{new_package}'"
         })
-        logger.info(f"Changed package to {new_package}")
+        logger.debug("Changed package to %s", new_package)
 
     def make_field_required(self, message_name: str, field_name: str):
         """Make an optional field required"""
-        # First, check if field already has field_behavior
-        pattern = rf'(\w+\s+{field_name}\s*=\s*\d+)(\s*\[[^\]]*\])?(\s*;)'
-
-        def replacer(match):
-            field_def = match.group(1)
-            options = match.group(2) if match.group(2) else ' ['
-
-            # Add required annotation
-            if '(google.api.field_behavior)' not in options:
-                if options == ' [':
-                    options = ' [\n    (google.api.field_behavior) = REQUIRED'
-                else:
-                    options = options.rstrip(']') + ',\n    (google.api.field_behavior) = REQUIRED]'
-
-            # Add validation
-            if '(buf.validate.field)' not in options:
-                options = options.rstrip(']') + ',\n    (buf.validate.field).required = true]'
+        field_node = self._lookup("message", message_name, field_name)
+        if field_node is None:
+            return
 
-            return field_def + options + match.group(3)
-
-        # Apply within the specific message
-        message_pattern = rf'(message\s+{message_name}\s*{{)([^}}]*)(}})'
-
-        def message_replacer(match):
-            message_body = re.sub(pattern, replacer, match.group(2))
-            return match.group(1) + message_body + match.group(3)
-
-        self.modified_content = re.sub(message_pattern, message_replacer, self.modified_content)
+        entries = [
+            entry for entry in self._option_entries(field_node)
+            if not entry.startswith(b'(google.api.field_behavior)') or not entry.endswith(b'OPTIONAL')
+        ]
+        # Add required annotation
+        if b'(google.api.field_behavior) = REQUIRED' not in entries:
+            entries.append(b'(google.api.field_behavior) = REQUIRED')
+        # Add validation
+        if not any(entry.startswith(b'(buf.validate.field)') for entry in entries):
+            entries.append(b'(buf.validate.field).required = true')
+
+        self._set_options(field_node, entries)
         self.changes_made.append({
             "type": ChangeType.MAKE_FIELD_REQUIRED.value,
             "message": message_name,
             "field": field_name,
             "details": f"Made field '{field_name}' required"
         })
-        logger.info(f"Made field {field_name} required in message {message_name}")
+        logger.debug("Made field %s required in message %s", field_name, message_name)
 
     def make_field_optional(self, message_name: str, field_name: str):
         """Make a required field optional"""
-        # Remove REQUIRED annotation and validation
-        patterns = [
-            rf'(\s*\(google\.api\.field_behavior\)\s*=\s*REQUIRED,?\n?)',
-            rf'(\s*\(buf\.validate\.field\)\.required\s*=\s*true,?\n?)'
-        ]
+        field_node = self._lookup("message", message_name, field_name)
+        if field_node is None:
+            return
 
-        # Apply within the specific message
-        message_pattern = rf'(message\s+{message_name}\s*{{)([^}}]*)(}})'
-
-        def message_replacer(match):
-            message_body = match.group(2)
-            for pattern in patterns:
-                message_body = re.sub(pattern, '', message_body)
-            return match.group(1) + message_body + match.group(3)
+        # Remove REQUIRED annotation and validation
+        required = (b'(google.api.field_behavior) = REQUIRED', b'(buf.validate.field).required = true')
+        entries = [entry for entry in self._option_entries(field_node) if entry not in required]
 
-        self.modified_content = re.sub(message_pattern, message_replacer, self.modified_content)
+        self._set_options(field_node, entries)
         self.changes_made.append({
             "type": ChangeType.MAKE_FIELD_OPTIONAL.value,
             "message": message_name,
             "field": field_name,
             "details": f"Made field '{field_name}' optional"
         })
-        logger.info(f"Made field {field_name} optional in message {message_name}")
+        logger.debug("Made field %s optional in message %s", field_name, message_name)
 
     def add_validation(self, message_name: str, field_name: str, validation: str):
         """Add validation rule to a field"""
-        pattern = rf'(\w+\s+{field_name}\s*=\s*\d+)(\s*\[[^\]]*\])?(\s*;)'
+        field_node = self._lookup("message", message_name, field_name)
+        if field_node is None:
+            return
 
-        def replacer(match):
-            field_def = match.group(1)
-            options = match.group(2) if match.group(2) else ' ['
+        entries = self._option_entries(field_node)
+        entries.append(f'(buf.validate.field).{validation}'.encode())
 
-            # Add validation
-            if '(buf.validate.field)' not in options:
-                if options == ' [':
-                    options = f' [\n    (buf.validate.field).{validation}'
-                else:
-                    options = options.rstrip(']') + f',\n    (buf.validate.field).{validation}]'
-            else:
-                # Append to existing validation
-                options = options.replace('(buf.validate.field)',
-                                        f'(buf.validate.field).{validation}, (buf.validate.field)')
-
-            return field_def + options + match.group(3)
-
-        # Apply within the specific message
-        message_pattern = rf'(message\s+{message_name}\s*{{)([^}}]*)(}})'
-
-        def message_replacer(match):
-            message_body = re.sub(pattern, replacer, match.group(2))
-            return match.group(1) + message_body + match.group(3)
-
-        self.modified_content = re.sub(message_pattern, message_replacer, self.modified_content)
+        self._set_options(field_node, entries)
         self.changes_made.append({
             "type": ChangeType.ADD_VALIDATION.value,
             "message": message_name,
@@ -419,7 +884,7 @@ class ProtoModifier:
             "validation": validation,
             "details": f"Added validation '{validation}' to field '{field_name}'"
         })
-        logger.info(f"Added validation to field {field_name} in message {message_name}")
+        logger.debug("Added validation to field %s in message %s", field_name, message_name)
 
     def get_changes_summary(self) -> dict:
         """Get summary of all changes made"""
@@ -430,256 +895,393 @@ class ProtoModifier:
         }
 
 
-def create_test_scenarios(proto_file: Path) -> List[dict]:
-    """Create various test scenarios for backward compatibility testing"""
-    scenarios = [
-        {
-            "name": "add_required_field",
-            "description": "Add a new required field to an existing message",
-            "changes": [
-                {
-                    "type": ChangeType.ADD_REQUIRED_FIELD,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "owner_id",
-                        "field_type": "string",
-                        "field_num": 20
-                    }
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize the parts of a scenario json cannot: read-only mappings, change types and hooks"""
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if callable(value):
+        return value.__name__
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=_json_default
+        )
+    return json.dumps(obj, indent=2, default=_json_default).encode()
+
+
+def _emit(obj: Any):
+    """Write a result to stdout as indented JSON in one write, bypassing the text layer"""
+    output = _dumps(obj) + b"\n"
+    stream = getattr(sys.stdout, "buffer", None)
+    if stream is None:
+        # stdout was replaced by a text-only stream
+        sys.stdout.write(output.decode())
+        return
+    # Anything already printed must come out first
+    sys.stdout.flush()
+    stream.write(output)
+
+
+def _make_metadata_optional(modifier: ProtoModifier):
+    """Post-process the add_optional_field scenario: the field is added as required first"""
+    modifier.make_field_optional("Task", "metadata")
+
+
+# Test scenarios for backward compatibility testing, built once at import and read-only
+_SCENARIOS: Tuple[Mapping[str, Any], ...] = _freeze([
+    {
+        "name": "add_required_field",
+        "description": "Add a new required field to an existing message",
+        "changes": [
+            {
+                "type": ChangeType.ADD_REQUIRED_FIELD,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "owner_id",
+                    "field_type": "string",
+                    "field_num": 20
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "HIGH"
-        },
-        {
-            "name": "remove_field",
-            "description": "Remove an existing field from a message",
-            "changes": [
-                {
-                    "type": ChangeType.REMOVE_FIELD,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "description"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "HIGH"
+    },
+    {
+        "name": "remove_field",
+        "description": "Remove an existing field from a message",
+        "changes": [
+            {
+                "type": ChangeType.REMOVE_FIELD,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "description"
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "HIGH"
-        },
-        {
-            "name": "change_field_type",
-            "description": "Change the type of an existing field",
-            "changes": [
-                {
-                    "type": ChangeType.CHANGE_FIELD_TYPE,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "title",
-                        "new_type": "bytes"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "HIGH"
+    },
+    {
+        "name": "change_field_type",
+        "description": "Change the type of an existing field",
+        "changes": [
+            {
+                "type": ChangeType.CHANGE_FIELD_TYPE,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "title",
+                    "new_type": "bytes"
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "HIGH"
-        },
-        {
-            "name": "change_field_number",
-            "description": "Change the field number of an existing field",
-            "changes": [
-                {
-                    "type": ChangeType.CHANGE_FIELD_NUMBER,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "title",
-                        "new_number": 50
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "HIGH"
+    },
+    {
+        "name": "change_field_number",
+        "description": "Change the field number of an existing field",
+        "changes": [
+            {
+                "type": ChangeType.CHANGE_FIELD_NUMBER,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "title",
+                    "new_number": 50
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "CRITICAL"
-        },
-        {
-            "name": "rename_field",
-            "description": "Rename an existing field",
-            "changes": [
-                {
-                    "type": ChangeType.RENAME_FIELD,
-                    "params": {
-                        "message_name": "Task",
-                        "old_name": "title",
-                        "new_name": "task_name"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "CRITICAL"
+    },
+    {
+        "name": "rename_field",
+        "description": "Rename an existing field",
+        "changes": [
+            {
+                "type": ChangeType.RENAME_FIELD,
+                "params": {
+                    "message_name": "Task",
+                    "old_name": "title",
+                    "new_name": "task_name"
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "HIGH"
-        },
-        {
-            "name": "remove_enum_value",
-            "description": "Remove a value from an enum",
-            "changes": [
-                {
-                    "type": ChangeType.REMOVE_ENUM_VALUE,
-                    "params": {
-                        "enum_name": "Status",
-                        "value_name": "STATUS_COMPLETED"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "HIGH"
+    },
+    {
+        "name": "remove_enum_value",
+        "description": "Remove a value from an enum",
+        "changes": [
+            {
+                "type": ChangeType.REMOVE_ENUM_VALUE,
+                "params": {
+                    "enum_name": "Status",
+                    "value_name": "STATUS_COMPLETED"
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "HIGH"
-        },
-        {
-            "name": "remove_rpc",
-            "description": "Remove an RPC from a service",
-            "changes": [
-                {
-                    "type": ChangeType.REMOVE_RPC,
-                    "params": {
-                        "service_name": "TodoService",
-                        "rpc_name": "GetTask"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "HIGH"
+    },
+    {
+        "name": "remove_rpc",
+        "description": "Remove an RPC from a service",
+        "changes": [
+            {
+                "type": ChangeType.REMOVE_RPC,
+                "params": {
+                    "service_name": "TodoService",
+                    "rpc_name": "GetTask"
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "CRITICAL"
-        },
-        {
-            "name": "change_rpc_signature",
-            "description": "Change RPC request or response type",
-            "changes": [
-                {
-                    "type": ChangeType.CHANGE_RPC,
-                    "params": {
-                        "service_name": "TodoService",
-                        "rpc_name": "CreateTask",
-                        "new_request": "Task",
-                        "new_response": None
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "CRITICAL"
+    },
+    {
+        "name": "change_rpc_signature",
+        "description": "Change RPC request or response type",
+        "changes": [
+            {
+                "type": ChangeType.CHANGE_RPC,
+                "params": {
+                    "service_name": "TodoService",
+                    "rpc_name": "CreateTask",
+                    "new_request": "Task",
+                    "new_response": None
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "HIGH"
-        },
-        {
-            "name": "make_field_required",
-            "description": "Make an optional field required",
-            "changes": [
-                {
-                    "type": ChangeType.MAKE_FIELD_REQUIRED,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "assignee"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "HIGH"
+    },
+    {
+        "name": "make_field_required",
+        "description": "Make an optional field required",
+        "changes": [
+            {
+                "type": ChangeType.MAKE_FIELD_REQUIRED,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "assignee"
                 }
-            ],
-            "expected_breaking": True,
-            "severity": "MEDIUM"
-        },
-        {
-            "name": "add_strict_validation",
-            "description": "Add strict validation to an existing field",
-            "changes": [
-                {
-                    "type": ChangeType.ADD_VALIDATION,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "title",
-                        "validation": "string.min_len = 10"
-                    }
+            }
+        ],
+        "expected_breaking": True,
+        "severity": "MEDIUM"
+    },
+    {
+        "name": "add_strict_validation",
+        "description": "Add strict validation to an existing field",
+        "changes": [
+            {
+                "type": ChangeType.ADD_VALIDATION,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "title",
+                    "validation": "string.min_len = 10"
                 }
-            ],
-            "expected_breaking": False,
-            "severity": "LOW"
-        },
-        {
-            "name": "add_optional_field",
-            "description": "Add a new optional field (non-breaking)",
-            "changes": [
-                {
-                    "type": ChangeType.ADD_REQUIRED_FIELD,
-                    "params": {
-                        "message_name": "Task",
-                        "field_name": "metadata",
-                        "field_type": "string",
-                        "field_num": 21
-                    }
+            }
+        ],
+        "expected_breaking": False,
+        "severity": "LOW"
+    },
+    {
+        "name": "add_optional_field",
+        "description": "Add a new optional field (non-breaking)",
+        "changes": [
+            {
+                "type": ChangeType.ADD_REQUIRED_FIELD,
+                "params": {
+                    "message_name": "Task",
+                    "field_name": "metadata",
+                    "field_type": "string",
+                    "field_num": 21
                 }
-            ],
-            "expected_breaking": False,
-            "severity": "NONE",
-            "post_process": lambda m: m.make_field_optional("Task", "metadata")
-        },
-        {
-            "name": "add_enum_value",
-            "description": "Add a new enum value (non-breaking)",
-            "changes": [
-                {
-                    "type": ChangeType.ADD_ENUM_VALUE,
-                    "params": {
-                        "enum_name": "Priority",
-                        "value_name": "PRIORITY_URGENT",
-                        "value_num": 5
-                    }
+            }
+        ],
+        "expected_breaking": False,
+        "severity": "NONE",
+        "post_process": _make_metadata_optional
+    },
+    {
+        "name": "add_enum_value",
+        "description": "Add a new enum value (non-breaking)",
+        "changes": [
+            {
+                "type": ChangeType.ADD_ENUM_VALUE,
+                "params": {
+                    "enum_name": "Priority",
+                    "value_name": "PRIORITY_URGENT",
+                    "value_num": 5
                 }
-            ],
-            "expected_breaking": False,
-            "severity": "NONE"
-        }
-    ]
-
-    return scenarios
+            }
+        ],
+        "expected_breaking": False,
+        "severity": "NONE"
+    }
+])
+
+
+def create_test_scenarios(proto_file: Path) -> Tuple[Mapping[str, Any], ...]:
+    """Return the test scenarios for backward compatibility testing
+
+    The scenarios do not depend on proto_file; the shared read-only tuple is returned.
+    """
+    return _SCENARIOS
+
+
+# ProtoModifier method that applies each change type, resolved once at import
+_MUTATORS: Dict[ChangeType, Callable[..., None]] = {
+    ChangeType.ADD_REQUIRED_FIELD: ProtoModifier.add_required_field,
+    ChangeType.REMOVE_FIELD: ProtoModifier.remove_field,
+    ChangeType.CHANGE_FIELD_TYPE: ProtoModifier.change_field_type,
+    ChangeType.CHANGE_FIELD_NUMBER: ProtoModifier.change_field_number,
+    ChangeType.RENAME_FIELD: ProtoModifier.rename_field,
+    ChangeType.ADD_ENUM_VALUE: ProtoModifier.add_enum_value,
+    ChangeType.REMOVE_ENUM_VALUE: ProtoModifier.remove_enum_value,
+    ChangeType.CHANGE_RPC: ProtoModifier.change_rpc,
+    ChangeType.ADD_RPC: ProtoModifier.add_rpc,
+    ChangeType.REMOVE_RPC: ProtoModifier.remove_rpc,
+    ChangeType.CHANGE_PACKAGE: ProtoModifier.change_package,
+    ChangeType.MAKE_FIELD_REQUIRED: ProtoModifier.make_field_required,
+    ChangeType.MAKE_FIELD_OPTIONAL: ProtoModifier.make_field_optional,
+    ChangeType.ADD_VALIDATION: ProtoModifier.add_validation,
+}
+
+
+# Manual changes from the CLI: the arguments each change type requires, and how they
+# map onto its mutator
+_CLI_CHANGES: Dict[ChangeType, Tuple[Tuple[str, ...], Callable[[ProtoModifier, Any], None]]] = {
+    ChangeType.ADD_REQUIRED_FIELD: (
+        ("message", "field", "field_type"),
+        lambda m, a: m.add_required_field(a.message, a.field, a.field_type, a.field_num or 99)),
+    ChangeType.REMOVE_FIELD: (
+        ("message", "field"),
+        lambda m, a: m.remove_field(a.message, a.field)),
+    ChangeType.CHANGE_FIELD_TYPE: (
+        ("message", "field", "field_type"),
+        lambda m, a: m.change_field_type(a.message, a.field, a.field_type)),
+    ChangeType.CHANGE_FIELD_NUMBER: (
+        ("message", "field", "field_num"),
+        lambda m, a: m.change_field_number(a.message, a.field, a.field_num)),
+    ChangeType.RENAME_FIELD: (
+        ("message", "field", "new_name"),
+        lambda m, a: m.rename_field(a.message, a.field, a.new_name)),
+    ChangeType.ADD_ENUM_VALUE: (
+        ("enum", "value"),
+        lambda m, a: m.add_enum_value(a.enum, a.value, a.field_num or 99)),
+    ChangeType.REMOVE_ENUM_VALUE: (
+        ("enum", "value"),
+        lambda m, a: m.remove_enum_value(a.enum, a.value)),
+    ChangeType.CHANGE_RPC: (
+        ("service", "rpc"),
+        lambda m, a: m.change_rpc(a.service, a.rpc, a.request_type, a.response_type)),
+    ChangeType.ADD_RPC: (
+        ("service", "rpc", "request_type", "response_type"),
+        lambda m, a: m.add_rpc(a.service, a.rpc, a.request_type, a.response_type)),
+    ChangeType.REMOVE_RPC: (
+        ("service", "rpc"),
+        lambda m, a: m.remove_rpc(a.service, a.rpc)),
+    ChangeType.CHANGE_PACKAGE: (
+        ("package",),
+        lambda m, a: m.change_package(a.package)),
+    ChangeType.MAKE_FIELD_REQUIRED: (
+        ("message", "field"),
+        lambda m, a: m.make_field_required(a.message, a.field)),
+    ChangeType.MAKE_FIELD_OPTIONAL: (
+        ("message", "field"),
+        lambda m, a: m.make_field_optional(a.message, a.field)),
+    ChangeType.ADD_VALIDATION: (
+        ("message", "field", "validation"),
+        lambda m, a: m.add_validation(a.message, a.field, a.validation)),
+}
+
+
+# A scenario change with its mutator and parameters bound, called with the modifier alone
+ScenarioStep = Callable[[ProtoModifier], None]
+
+
+def _compile_changes(changes) -> Tuple[ScenarioStep, ...]:
+    """Bind each change's mutator to its parameters, leaving only the modifier to pass"""
+    steps = []
+    for change in changes:
+        mutator = _MUTATORS.get(change["type"])
+        if mutator is None:
+            logger.warning("Unsupported change type: %s", change['type'])
+            continue
+        steps.append(partial(mutator, **change["params"]))
+    return tuple(steps)
+
+
+# Each built-in scenario by name, with its changes compiled once at import
+_COMPILED_SCENARIOS: Dict[str, Tuple[Mapping[str, Any], Tuple[ScenarioStep, ...]]] = {
+    scenario["name"]: (scenario, _compile_changes(scenario["changes"])) for scenario in _SCENARIOS
+}
 
 
 def apply_scenario(modifier: ProtoModifier, scenario: dict) -> dict:
     """Apply a test scenario to the proto file"""
-    logger.info(f"Applying scenario: {scenario['name']}")
-
-    for change in scenario["changes"]:
-        change_type = change["type"]
-        params = change["params"]
-
-        if change_type == ChangeType.ADD_REQUIRED_FIELD:
-            modifier.add_required_field(**params)
-        elif change_type == ChangeType.REMOVE_FIELD:
-            modifier.remove_field(**params)
-        elif change_type == ChangeType.CHANGE_FIELD_TYPE:
-            modifier.change_field_type(**params)
-        elif change_type == ChangeType.CHANGE_FIELD_NUMBER:
-            modifier.change_field_number(**params)
-        elif change_type == ChangeType.RENAME_FIELD:
-            modifier.rename_field(**params)
-        elif change_type == ChangeType.ADD_ENUM_VALUE:
-            modifier.add_enum_value(**params)
-        elif change_type == ChangeType.REMOVE_ENUM_VALUE:
-            modifier.remove_enum_value(**params)
-        elif change_type == ChangeType.CHANGE_RPC:
-            modifier.change_rpc(**params)
-        elif change_type == ChangeType.ADD_RPC:
-            modifier.add_rpc(**params)
-        elif change_type == ChangeType.REMOVE_RPC:
-            modifier.remove_rpc(**params)
-        elif change_type == ChangeType.CHANGE_PACKAGE:
-            modifier.change_package(**params)
-        elif change_type == ChangeType.MAKE_FIELD_REQUIRED:
-            modifier.make_field_required(**params)
-        elif change_type == ChangeType.MAKE_FIELD_OPTIONAL:
-            modifier.make_field_optional(**params)
-        elif change_type == ChangeType.ADD_VALIDATION:
-            modifier.add_validation(**params)
+    logger.debug("Applying scenario: %s", scenario['name'])
+
+    compiled = _COMPILED_SCENARIOS.get(scenario["name"])
+    if compiled is not None and compiled[0] is scenario:
+        steps = compiled[1]
+    else:
+        # Scenarios built by callers are compiled on each use
+        steps = _compile_changes(scenario["changes"])
+
+    with modifier.batch():
+        for step in steps:
+            step(modifier)
 
     # Apply post-processing if defined
     if "post_process" in scenario:
         scenario["post_process"](modifier)
 
-    return modifier.get_changes_summary()
+    summary = modifier.get_changes_summary()
+    logger.info("Applied scenario %s: %d changes", scenario['name'], summary["total_changes"])
+    return summary
+
+
+def apply_scenario_to_file(proto_file: Path, scenario_name: str) -> dict:
+    """Apply a named scenario to a fresh in-memory copy of a proto file
+
+    Nothing is written to disk, so sweeps over the same file cannot race, and the
+    arguments are plain picklable values for use with a process pool.
+    """
+    scenario = _COMPILED_SCENARIOS[scenario_name][0]
+    return apply_scenario(ProtoModifier(proto_file), scenario)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Modify Proto files for testing API compatibility")
-    parser.add_argument("proto_file", type=str, help="Path to the proto file to modify")
-    parser.add_argument("--change-type", type=str, choices=[c.value for c in ChangeType],
+    parser.add_argument("proto_file", type=str, nargs="+",
+                       help="Path to the proto file to modify (several with --scenario all)")
+    # Only the changes the CLI can build from its flags, so the table and the choices cannot drift
+    parser.add_argument("--change-type", type=str, choices=[c.value for c in _CLI_CHANGES],
                        help="Type of change to apply")
-    parser.add_argument("--scenario", type=str, help="Apply a predefined test scenario")
+    parser.add_argument("--scenario", type=str,
+                       help="Apply a predefined test scenario, or 'all' to sweep every scenario "
+                            "over in-memory copies without saving")
+    parser.add_argument("--parallel", action="store_true",
+                       help="Spread a --scenario all sweep across CPU cores")
     parser.add_argument("--list-scenarios", action="store_true",
                        help="List available test scenarios")
     parser.add_argument("--restore", action="store_true",
@@ -688,6 +1290,8 @@ def main():
                        help="Show changes without applying them")
     parser.add_argument("--output-json", type=str,
                        help="Output changes summary to JSON file")
+    parser.add_argument("--quiet", action="store_true",
+                       help="Only log warnings and errors")
 
     # Change-specific arguments
     parser.add_argument("--message", type=str, help="Message name")
@@ -705,11 +1309,35 @@ def main():
     parser.add_argument("--package", type=str, help="New package name")
 
     args = parser.parse_args()
+    if args.quiet:
+        logger.setLevel(logging.WARNING)
+
+    proto_paths = [Path(proto_file) for proto_file in args.proto_file]
+    for proto_path in proto_paths:
+        if not proto_path.exists():
+            logger.error("Proto file not found: %s", proto_path)
+            sys.exit(1)
+
+    if args.scenario == "all":
+        # Every (file, scenario) pair is independent; parsing is CPU-bound, so fan out to processes
+        jobs = [(path, scenario["name"]) for path in proto_paths for scenario in _SCENARIOS]
+        if args.parallel:
+            with ProcessPoolExecutor() as executor:
+                summaries = list(executor.map(apply_scenario_to_file, *zip(*jobs)))
+        else:
+            summaries = [apply_scenario_to_file(path, name) for path, name in jobs]
+        results = [{"scenario": name, **summary} for (_, name), summary in zip(jobs, summaries)]
+
+        if args.output_json:
+            Path(args.output_json).write_bytes(_dumps(results))
+
+        _emit(results)
+        return
 
-    proto_path = Path(args.proto_file)
-    if not proto_path.exists():
-        logger.error(f"Proto file not found: {proto_path}")
+    if len(proto_paths) > 1:
+        logger.error("Several proto files are only supported with --scenario all")
         sys.exit(1)
+    proto_path = proto_paths[0]
 
     modifier = ProtoModifier(proto_path)
 
@@ -734,7 +1362,7 @@ def main():
         scenarios = create_test_scenarios(proto_path)
         scenario = next((s for s in scenarios if s["name"] == args.scenario), None)
         if not scenario:
-            logger.error(f"Scenario not found: {args.scenario}")
+            logger.error("Scenario not found: %s", args.scenario)
             sys.exit(1)
 
         summary = apply_scenario(modifier, scenario)
@@ -743,91 +1371,22 @@ def main():
             modifier.save()
 
         if args.output_json:
-            with open(args.output_json, 'w') as f:
-                json.dump({
-                    "scenario": scenario,
-                    "changes": summary
-                }, f, indent=2)
+            Path(args.output_json).write_bytes(_dumps({
+                "scenario": scenario,
+                "changes": summary
+            }))
 
-        print(json.dumps(summary, indent=2))
+        _emit(summary)
         return
 
     # Manual change application
     if args.change_type:
-        change_type = ChangeType(args.change_type)
-
-        if change_type == ChangeType.ADD_REQUIRED_FIELD:
-            if not all([args.message, args.field, args.field_type]):
-                logger.error("Required: --message, --field, --field-type")
-                sys.exit(1)
-            modifier.add_required_field(args.message, args.field,
-                                       args.field_type, args.field_num or 99)
-
-        elif change_type == ChangeType.REMOVE_FIELD:
-            if not all([args.message, args.field]):
-                logger.error("Required: --message, --field")
-                sys.exit(1)
-            modifier.remove_field(args.message, args.field)
-
-        elif change_type == ChangeType.CHANGE_FIELD_TYPE:
-            if not all([args.message, args.field, args.field_type]):
-                logger.error("Required: --message, --field, --field-type")
-                sys.exit(1)
-            modifier.change_field_type(args.message, args.field, args.field_type)
-
-        elif change_type == ChangeType.CHANGE_FIELD_NUMBER:
-            if not all([args.message, args.field, args.field_num]):
-                logger.error("Required: --message, --field, --field-num")
-                sys.exit(1)
-            modifier.change_field_number(args.message, args.field, args.field_num)
-
-        elif change_type == ChangeType.RENAME_FIELD:
-            if not all([args.message, args.field, args.new_name]):
-                logger.error("Required: --message, --field, --new-name")
-                sys.exit(1)
-            modifier.rename_field(args.message, args.field, args.new_name)
-
-        elif change_type == ChangeType.ADD_ENUM_VALUE:
-            if not all([args.enum, args.value]):
-                logger.error("Required: --enum, --value")
-                sys.exit(1)
-            modifier.add_enum_value(args.enum, args.value, args.field_num or 99)
-
-        elif change_type == ChangeType.REMOVE_ENUM_VALUE:
-            if not all([args.enum, args.value]):
-                logger.error("Required: --enum, --value")
-                sys.exit(1)
-            modifier.remove_enum_value(args.enum, args.value)
-
-        elif change_type == ChangeType.REMOVE_RPC:
-            if not all([args.service, args.rpc]):
-                logger.error("Required: --service, --rpc")
-                sys.exit(1)
-            modifier.remove_rpc(args.service, args.rpc)
-
-        elif change_type == ChangeType.CHANGE_PACKAGE:
-            if not args.package:
-                logger.error("Required: --package")
-                sys.exit(1)
-            modifier.change_package(args.package)
-
-        elif change_type == ChangeType.MAKE_FIELD_REQUIRED:
-            if not all([args.message, args.field]):
-                logger.error("Required: --message, --field")
-                sys.exit(1)
-            modifier.make_field_required(args.message, args.field)
-
-        elif change_type == ChangeType.MAKE_FIELD_OPTIONAL:
-            if not all([args.message, args.field]):
-                logger.error("Required: --message, --field")
-                sys.exit(1)
-            modifier.make_field_optional(args.message, args.field)
-
-        elif change_type == ChangeType.ADD_VALIDATION:
-            if not all([args.message, args.field, args.validation]):
-                logger.error("Required: --message, --field, --validation")
-                sys.exit(1)
-            modifier.add_validation(args.message, args.field, args.validation)
+        required, apply_change = _CLI_CHANGES[ChangeType(args.change_type)]
+        missing = [dest for dest in required if not getattr(args, dest)]
+        if missing:
+            logger.error("Required: %s", ", ".join("--" + dest.replace("_", "-") for dest in missing))
+            sys.exit(1)
+        apply_change(modifier, args)
 
         summary = modifier.get_changes_summary()
 
@@ -835,10 +1394,9 @@ def main():
             modifier.save()
 
         if args.output_json:
-            with open(args.output_json, 'w') as f:
-                json.dump(summary, f, indent=2)
+            Path(args.output_json).write_bytes(_dumps(summary))
 
-        print(json.dumps(summary, indent=2))
+        _emit(summary)
     else:
         logger.error("Please specify --change-type, --scenario, or --restore")
         sys.exit(1)
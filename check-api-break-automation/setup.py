@@ -58,6 +58,8 @@ setup(
             "deepdiff>=6.7.0",
             "colorama>=0.4.6",
             "aiofiles>=23.0.0",
+            "orjson>=3.9.0",
+            "google-re2>=1.1",
         ]
     },
     entry_points={
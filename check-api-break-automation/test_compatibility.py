@@ -6,19 +6,32 @@ This script provides comprehensive testing of the compatibility checker
 with various proto file modifications and scenarios.
 """
 
+import argparse
 import asyncio
 import json
 import logging
+import shutil
 import sys
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, is_dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Union
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from proto_modifier import ProtoModifier, ChangeType, create_test_scenarios
-from api_compatibility_checker import CompatibilityChecker, BreakingSeverity
+from proto_modifier import ChangeType, ProtoModifier, apply_scenario, create_test_scenarios
+from api_compatibility_checker import CompatibilityChecker, BreakingSeverity, run_command_async
 from buf_integration import BufIntegration
+from compat import DATACLASS_SLOTS
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -27,88 +40,311 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Scenarios checked at once, each in its own worktree; bounded to stay within Vertex AI quotas
+MAX_CONCURRENT_SCENARIOS = 8
+
+# The proto the tests modify, relative to the workspace or its counterpart in a sandbox
+PROTO_RELPATH = Path("api/proto/todo/v1/todo.proto")
+
+# Output suffixes that stream results as NDJSON, one line per result as it completes
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+@dataclass(**DATACLASS_SLOTS)
+class WorkspaceLayout:
+    """Where the workspace sits in its git repository and what differs from HEAD"""
+    prefix: Path
+    changed: List[str]
+    deleted: List[str]
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ScenarioResult:
+    """Outcome of checking one predefined scenario"""
+    scenario: str
+    description: str
+    expected_breaking: bool
+    actual_breaking: bool
+    expected_severity: str
+    actual_severity: str
+    passed: bool
+    changes_made: List[Dict[str, Any]]
+    report_summary: Dict[str, Any]
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ScenarioError:
+    """A scenario that raised before its check completed"""
+    scenario: str
+    error: str
+    passed: bool = False
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ComplexScenarioResult:
+    """What the checker detected for one multi-change scenario"""
+    scenario: str
+    detected_changes: int
+    detected_breaking: int
+    severity: str
+    can_deploy: bool
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize result records as objects and anything else json cannot handle as a string"""
+    if is_dataclass(value):
+        return asdict(value)
+    return str(value)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize test results to indented UTF-8 JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        # orjson serializes dataclasses natively
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(obj, indent=2, default=_json_default).encode()
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize a single result as one newline-terminated line of JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE, default=str
+        )
+    return json.dumps(obj, default=_json_default).encode() + b"\n"
+
+
+class ResultWriter:
+    """
+    Write test results to the output file
+
+    Outputs ending in .ndjson or .jsonl get one {"section": ..., ...} line per
+    result, written and flushed as soon as the result arrives, so nothing is
+    buffered and an interrupted run keeps what finished. Any other output gets
+    the single JSON document keyed by section that the docs' examples read;
+    it is only written, replacing the file, when the with block exits cleanly.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.streaming = path.suffix in NDJSON_SUFFIXES
+        self._sections: Dict[str, Any] = {}
+        self._file = None
+
+    def __enter__(self) -> "ResultWriter":
+        if self.streaming:
+            self._file = open(self.path, "wb")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.streaming:
+            self._file.close()
+        elif exc_type is None:
+            # Opened only now, so a run that crashes leaves any previous results in place
+            with open(self.path, "wb") as f:
+                f.write(_dumps(self._sections))
+
+    def append(self, section: str, record: Any):
+        """Add one record to a section holding a list of results"""
+        if self.streaming:
+            self._write(section, record)
+        else:
+            self._sections.setdefault(section, []).append(record)
+
+    def set(self, section: str, value: Dict[str, Any]):
+        """Add a section holding a single result"""
+        if self.streaming:
+            self._write(section, value)
+        else:
+            self._sections[section] = value
+
+    def _write(self, section: str, record: Any):
+        fields = asdict(record) if is_dataclass(record) else record
+        self._file.write(_dumps_line({"section": section, **fields}))
+        self._file.flush()
+
 
 class CompatibilityTester:
     """Test harness for API compatibility checking"""
 
     def __init__(self, workspace_path: Path):
         self.workspace_path = workspace_path
-        self.proto_file = workspace_path / "api/proto/todo/v1/todo.proto"
+        self.proto_file = workspace_path / PROTO_RELPATH
         self.results = []
-
-    async def run_test_scenario(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
-        """Run a single test scenario"""
+        # Snapshot of the unmodified proto, shared by every modifier and copied into each sandbox
+        self._original = self.proto_file.read_bytes()
+        self._layout_task: Optional["asyncio.Future[WorkspaceLayout]"] = None
+
+    @cached_property
+    def checker(self) -> CompatibilityChecker:
+        """Checker for the workspace, created on first use and shared by every test"""
+        return CompatibilityChecker(self.workspace_path)
+
+    @cached_property
+    def buf(self) -> BufIntegration:
+        """Buf integration for the workspace, created on first use"""
+        return BufIntegration(self.workspace_path)
+
+    def _modifier(self) -> ProtoModifier:
+        """Create a modifier over the snapshot, so it never reads the file"""
+        return ProtoModifier(self.proto_file, original_bytes=self._original)
+
+    async def _git(self, *args: str) -> str:
+        """Run a git command in the workspace and return its stdout, raising if it fails"""
+        returncode, stdout, stderr = await run_command_async(["git", *args], self.workspace_path)
+        if returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed: {stderr.strip()}")
+        return stdout
+
+    async def _read_layout(self) -> WorkspaceLayout:
+        """Find the workspace within its repository and list its uncommitted files"""
+        # Drop worktrees still registered by an earlier run whose directories are gone
+        await run_command_async(["git", "worktree", "prune"], self.workspace_path)
+        prefix = (await self._git("rev-parse", "--show-prefix")).strip()
+        # Paths are relative to the workspace; --modified also lists deleted files
+        deleted = (await self._git("ls-files", "-z", "--deleted")).split("\0")
+        changed = (await self._git(
+            "ls-files", "-z", "--modified", "--others", "--exclude-standard"
+        )).split("\0")
+        deleted = [name for name in deleted if name]
+        gone = set(deleted)
+        return WorkspaceLayout(
+            prefix=Path(prefix),
+            changed=[name for name in changed if name and name not in gone],
+            deleted=deleted,
+        )
+
+    def _layout(self) -> "asyncio.Future[WorkspaceLayout]":
+        """Read the workspace layout once, shared by every sandbox including concurrent ones"""
+        if self._layout_task is None:
+            self._layout_task = asyncio.ensure_future(self._read_layout())
+        return self._layout_task
+
+    def _overlay(self, workspace: Path, layout: WorkspaceLayout):
+        """Copy the workspace's uncommitted changes over a fresh checkout of HEAD"""
+        for name in layout.deleted:
+            (workspace / name).unlink(missing_ok=True)
+        for name in layout.changed:
+            source = self.workspace_path / name
+            # A modified submodule is listed as a directory; its checkout is not needed
+            if source.is_dir() and not source.is_symlink():
+                continue
+            target = workspace / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target, follow_symlinks=False)
+
+    @asynccontextmanager
+    async def _sandbox(self) -> AsyncIterator[Path]:
+        """Check out a detached git worktree of the workspace, removed again on exit
+
+        The checker needs the git history and buf configuration, not just the
+        proto file, so each scenario gets a worktree rather than a bare copy.
+        Uncommitted and untracked files in the workspace are copied over it, and
+        the path yielded is the workspace's counterpart within the worktree.
+        """
+        layout = await self._layout()
+        sandbox = Path(tempfile.mkdtemp(prefix="api-compat-"))
+        returncode, _, stderr = await run_command_async(
+            ["git", "worktree", "add", "--detach", str(sandbox), "HEAD"], self.workspace_path
+        )
+        if returncode != 0:
+            shutil.rmtree(sandbox, ignore_errors=True)
+            # git may have registered the worktree before failing
+            await run_command_async(["git", "worktree", "prune"], self.workspace_path)
+            raise RuntimeError(f"git worktree add failed: {stderr.strip()}")
+        try:
+            workspace = sandbox / layout.prefix
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._overlay, workspace, layout
+            )
+            yield workspace
+        finally:
+            returncode, _, _ = await run_command_async(
+                ["git", "worktree", "remove", "--force", str(sandbox)], self.workspace_path
+            )
+            shutil.rmtree(sandbox, ignore_errors=True)
+            if returncode != 0:
+                # Its directory is gone now, so prune drops the registration left behind
+                await run_command_async(["git", "worktree", "prune"], self.workspace_path)
+
+    def _sandbox_modifier(self, sandbox: Path) -> ProtoModifier:
+        """Create a modifier for the proto in a sandbox, starting it from the snapshot"""
+        proto_path = sandbox / PROTO_RELPATH
+        # The snapshot may include changes to the proto that are not yet committed
+        proto_path.write_bytes(self._original)
+        return ProtoModifier(proto_path, original_bytes=self._original)
+
+    async def run_test_scenario(self, scenario: Dict[str, Any]) -> ScenarioResult:
+        """Run a single test scenario in its own worktree, leaving the workspace untouched"""
         logger.info(f"Testing scenario: {scenario['name']}")
 
-        # Create modifier
-        modifier = ProtoModifier(self.proto_file)
-
-        # Apply scenario
-        changes_summary = apply_scenario(modifier, scenario)
+        async with self._sandbox() as sandbox:
+            # Apply scenario to the sandbox copy; it is discarded afterwards, so no backup
+            modifier = self._sandbox_modifier(sandbox)
+            changes_summary = apply_scenario(modifier, scenario)
+            modifier.save(backup=False)
 
-        # Save modified file
-        modifier.save()
-
-        try:
-            # Run compatibility check
-            checker = CompatibilityChecker(self.workspace_path)
-            report = await checker.check_compatibility()
+            # Run compatibility check, reusing the shared checker's LLM client and cache
+            report = await self.checker.for_workspace(sandbox).check_compatibility()
 
             # Compare expected vs actual
             expected_breaking = scenario.get("expected_breaking", False)
             actual_breaking = report.breaking_changes > 0
 
-            result = {
-                "scenario": scenario["name"],
-                "description": scenario["description"],
-                "expected_breaking": expected_breaking,
-                "actual_breaking": actual_breaking,
-                "expected_severity": scenario.get("severity", "NONE"),
-                "actual_severity": report.overall_severity.value,
-                "passed": expected_breaking == actual_breaking,
-                "changes_made": changes_summary["changes"],
-                "report_summary": {
+            result = ScenarioResult(
+                scenario=scenario["name"],
+                description=scenario["description"],
+                expected_breaking=expected_breaking,
+                actual_breaking=actual_breaking,
+                expected_severity=scenario.get("severity", "NONE"),
+                actual_severity=report.overall_severity.value,
+                passed=expected_breaking == actual_breaking,
+                changes_made=changes_summary["changes"],
+                report_summary={
                     "total_changes": report.total_changes,
                     "breaking_changes": report.breaking_changes,
                     "can_deploy": report.can_deploy
                 }
-            }
-
-        finally:
-            # Restore original file
-            modifier.restore()
+            )
 
         return result
 
-    async def run_all_scenarios(self) -> List[Dict[str, Any]]:
-        """Run all predefined test scenarios"""
-        scenarios = create_test_scenarios(self.proto_file)
-        results = []
-
-        for scenario in scenarios:
-            try:
-                result = await self.run_test_scenario(scenario)
-                results.append(result)
-
-                # Log result
-                status = "✅ PASSED" if result["passed"] else "❌ FAILED"
-                logger.info(f"{status}: {scenario['name']}")
+    async def run_all_scenarios(
+        self, on_result: Optional[Callable[[Union[ScenarioResult, ScenarioError]], None]] = None
+    ) -> List[Union[ScenarioResult, ScenarioError]]:
+        """
+        Run all predefined test scenarios concurrently, so LLM latency overlaps
 
-            except Exception as e:
-                logger.error(f"Error in scenario {scenario['name']}: {e}")
-                results.append({
-                    "scenario": scenario["name"],
-                    "error": str(e),
-                    "passed": False
-                })
-
-        return results
+        on_result, if given, is called with each result as soon as its scenario
+        finishes; the returned list is in scenario order.
+        """
+        scenarios = create_test_scenarios(self.proto_file)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCENARIOS)
+
+        async def run(scenario: Dict[str, Any]) -> Union[ScenarioResult, ScenarioError]:
+            async with semaphore:
+                try:
+                    result = await self.run_test_scenario(scenario)
+                except Exception as e:
+                    # Any failure fails just this scenario, rather than aborting the others
+                    logger.error("Error in scenario %s: %s", scenario['name'], e)
+                    result = ScenarioError(scenario=scenario["name"], error=str(e))
+                else:
+                    # Log result
+                    status = "✅ PASSED" if result.passed else "❌ FAILED"
+                    logger.info(f"{status}: {scenario['name']}")
+
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(run(s) for s in scenarios)))
 
     def test_buf_integration(self) -> Dict[str, Any]:
         """Test buf tool integration"""
         logger.info("Testing buf integration...")
 
-        buf = BufIntegration(self.workspace_path)
+        buf = self.buf
         results = {}
 
         # Test lint
@@ -139,7 +375,7 @@ class CompatibilityTester:
         logger.info("Testing semantic analysis...")
 
         # Create a modifier
-        modifier = ProtoModifier(self.proto_file)
+        modifier = self._modifier()
 
         # Test various semantic changes
         semantic_tests = [
@@ -184,9 +420,30 @@ class CompatibilityTester:
             {
                 "name": "multiple_changes",
                 "changes": [
-                    ("add_required_field", {"message_name": "Task", "field_name": "owner_id", "field_type": "string"}),
-                    ("remove_field", {"message_name": "Task", "field_name": "description"}),
-                    ("change_field_type", {"message_name": "Task", "field_name": "priority", "new_type": "int64"})
+                    {
+                        "type": ChangeType.ADD_REQUIRED_FIELD,
+                        "params": {
+                            "message_name": "Task",
+                            "field_name": "owner_id",
+                            "field_type": "string",
+                            "field_num": 99
+                        }
+                    },
+                    {
+                        "type": ChangeType.REMOVE_FIELD,
+                        "params": {
+                            "message_name": "Task",
+                            "field_name": "description"
+                        }
+                    },
+                    {
+                        "type": ChangeType.CHANGE_FIELD_TYPE,
+                        "params": {
+                            "message_name": "Task",
+                            "field_name": "priority",
+                            "new_type": "int64"
+                        }
+                    }
                 ],
                 "expected_breaking": True,
                 "expected_severity": "CRITICAL"
@@ -196,92 +453,48 @@ class CompatibilityTester:
         results = []
 
         for scenario in complex_scenarios:
-            modifier = ProtoModifier(self.proto_file)
-
-            # Apply multiple changes
-            for change_type, params in scenario["changes"]:
-                if change_type == "add_required_field":
-                    modifier.add_required_field(**params, field_num=99)
-                elif change_type == "remove_field":
-                    modifier.remove_field(**params)
-                elif change_type == "change_field_type":
-                    modifier.change_field_type(**params)
+            # Like the predefined scenarios, each runs in a worktree, so nothing needs restoring
+            async with self._sandbox() as sandbox:
+                modifier = self._sandbox_modifier(sandbox)
+                apply_scenario(modifier, scenario)
+                modifier.save(backup=False)
 
-            modifier.save()
-
-            try:
                 # Run analysis
-                checker = CompatibilityChecker(self.workspace_path)
-                report = await checker.check_compatibility()
-
-                results.append({
-                    "scenario": scenario["name"],
-                    "detected_changes": report.total_changes,
-                    "detected_breaking": report.breaking_changes,
-                    "severity": report.overall_severity.value,
-                    "can_deploy": report.can_deploy
-                })
+                report = await self.checker.for_workspace(sandbox).check_compatibility()
 
-            finally:
-                modifier.restore()
+            results.append(ComplexScenarioResult(
+                scenario=scenario["name"],
+                detected_changes=report.total_changes,
+                detected_breaking=report.breaking_changes,
+                severity=report.overall_severity.value,
+                can_deploy=report.can_deploy
+            ))
 
         return {"complex_scenarios": results}
 
 
-def apply_scenario(modifier: ProtoModifier, scenario: dict) -> dict:
-    """Apply a test scenario to the proto file"""
-    for change in scenario["changes"]:
-        change_type = change["type"]
-        params = change["params"]
-
-        if change_type == ChangeType.ADD_REQUIRED_FIELD:
-            modifier.add_required_field(**params)
-        elif change_type == ChangeType.REMOVE_FIELD:
-            modifier.remove_field(**params)
-        elif change_type == ChangeType.CHANGE_FIELD_TYPE:
-            modifier.change_field_type(**params)
-        elif change_type == ChangeType.CHANGE_FIELD_NUMBER:
-            modifier.change_field_number(**params)
-        elif change_type == ChangeType.RENAME_FIELD:
-            modifier.rename_field(**params)
-        elif change_type == ChangeType.ADD_ENUM_VALUE:
-            modifier.add_enum_value(**params)
-        elif change_type == ChangeType.REMOVE_ENUM_VALUE:
-            modifier.remove_enum_value(**params)
-        elif change_type == ChangeType.REMOVE_RPC:
-            modifier.remove_rpc(**params)
-        elif change_type == ChangeType.MAKE_FIELD_REQUIRED:
-            modifier.make_field_required(**params)
-        elif change_type == ChangeType.ADD_VALIDATION:
-            modifier.add_validation(**params)
-
-    # Apply post-processing if defined
-    if "post_process" in scenario:
-        scenario["post_process"](modifier)
-
-    return modifier.get_changes_summary()
+# Built once at import rather than on every call to main()
+parser = argparse.ArgumentParser(description="Test API Compatibility Checker")
+parser.add_argument("--workspace", type=str, default="..",
+                   help="Workspace path containing proto files")
+parser.add_argument("--output", type=str, default="test_results.json",
+                   help="Output file for test results (.ndjson/.jsonl to stream them)")
+parser.add_argument("--verbose", action="store_true",
+                   help="Enable verbose output")
 
 
 async def main():
     """Main test runner"""
-    import argparse
-
-    parser = argparse.ArgumentParser(description="Test API Compatibility Checker")
-    parser.add_argument("--workspace", type=str, default="..",
-                       help="Workspace path containing proto files")
-    parser.add_argument("--output", type=str, default="test_results.json",
-                       help="Output file for test results")
-    parser.add_argument("--verbose", action="store_true",
-                       help="Enable verbose output")
-
     args = parser.parse_args()
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    workspace_path = Path(args.workspace).resolve()
-    if not workspace_path.exists():
-        logger.error(f"Workspace not found: {workspace_path}")
+    # A strict resolve checks existence in the same pass
+    try:
+        workspace_path = Path(args.workspace).resolve(strict=True)
+    except FileNotFoundError:
+        logger.error(f"Workspace not found: {Path(args.workspace).absolute()}")
         sys.exit(1)
 
     # Run tests
@@ -291,66 +504,69 @@ async def main():
     print("API Compatibility Checker - Test Suite")
     print("=" * 60 + "\n")
 
-    all_results = {}
-
-    # Test 1: Predefined scenarios
-    print("1. Testing predefined scenarios...")
-    scenario_results = await tester.run_all_scenarios()
-    all_results["scenarios"] = scenario_results
-
-    passed = sum(1 for r in scenario_results if r.get("passed", False))
-    total = len(scenario_results)
-    print(f"   Results: {passed}/{total} passed\n")
-
-    # Test 2: Buf integration
-    print("2. Testing buf integration...")
-    buf_results = tester.test_buf_integration()
-    all_results["buf_integration"] = buf_results
-    print(f"   Lint success: {buf_results['lint']['success']}")
-    print(f"   Breaking check success: {buf_results['breaking']['success']}\n")
-
-    # Test 3: Semantic analysis
-    print("3. Testing semantic analysis...")
-    semantic_results = tester.test_semantic_analysis()
-    all_results["semantic_analysis"] = semantic_results
-    print(f"   Tested {len(semantic_results['semantic_tests'])} semantic changes\n")
-
-    # Test 4: LLM accuracy
-    print("4. Testing LLM analysis accuracy...")
-    llm_results = await tester.test_llm_analysis_accuracy()
-    all_results["llm_accuracy"] = llm_results
-    print(f"   Tested {len(llm_results['complex_scenarios'])} complex scenarios\n")
-
-    # Save results
-    with open(args.output, 'w') as f:
-        json.dump(all_results, f, indent=2, default=str)
+    with ResultWriter(Path(args.output)) as writer:
+        # Test 1: Predefined scenarios
+        print("1. Testing predefined scenarios...")
+        # Tallied as each result streams in, so the summary needs no further passes
+        passed_tests = 0
+        failed = []
+
+        def record(result: Union[ScenarioResult, ScenarioError]):
+            nonlocal passed_tests
+            writer.append("scenarios", result)
+            if result.passed:
+                passed_tests += 1
+            else:
+                failed.append(result)
+
+        await tester.run_all_scenarios(on_result=record)
+
+        total_tests = passed_tests + len(failed)
+        print(f"   Results: {passed_tests}/{total_tests} passed\n")
+
+        # Test 2: Buf integration
+        print("2. Testing buf integration...")
+        buf_results = tester.test_buf_integration()
+        writer.set("buf_integration", buf_results)
+        print(f"   Lint success: {buf_results['lint']['success']}")
+        print(f"   Breaking check success: {buf_results['breaking']['success']}\n")
+
+        # Test 3: Semantic analysis
+        print("3. Testing semantic analysis...")
+        semantic_results = tester.test_semantic_analysis()
+        writer.set("semantic_analysis", semantic_results)
+        print(f"   Tested {len(semantic_results['semantic_tests'])} semantic changes\n")
+
+        # Test 4: LLM accuracy
+        print("4. Testing LLM analysis accuracy...")
+        llm_results = await tester.test_llm_analysis_accuracy()
+        writer.set("llm_accuracy", llm_results)
+        print(f"   Tested {len(llm_results['complex_scenarios'])} complex scenarios\n")
 
     print("\n" + "=" * 60)
     print("Test Results Summary")
     print("=" * 60)
 
     # Summary statistics
-    total_tests = len(scenario_results)
-    passed_tests = sum(1 for r in scenario_results if r.get("passed", False))
     success_rate = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
 
     print(f"Total Scenarios: {total_tests}")
     print(f"Passed: {passed_tests}")
-    print(f"Failed: {total_tests - passed_tests}")
+    print(f"Failed: {len(failed)}")
     print(f"Success Rate: {success_rate:.1f}%")
 
     # Failed scenarios
-    failed = [r for r in scenario_results if not r.get("passed", False)]
     if failed:
         print("\nFailed Scenarios:")
         for failure in failed:
-            print(f"  - {failure['scenario']}: Expected breaking={failure.get('expected_breaking')}, "
-                  f"Got breaking={failure.get('actual_breaking')}")
+            print(f"  - {failure.scenario}: "
+                  f"Expected breaking={getattr(failure, 'expected_breaking', None)}, "
+                  f"Got breaking={getattr(failure, 'actual_breaking', None)}")
 
     print(f"\nDetailed results saved to: {args.output}")
 
     # Exit code based on test results
-    sys.exit(0 if passed_tests == total_tests else 1)
+    sys.exit(0 if not failed else 1)
 
 
 if __name__ == "__main__":